@@ -1,108 +1,156 @@
 """
-This module imports the necessary libraries for data processing and visualization.
+Streamlit adapter of the Non-PO payment analysis.
+
+The analysis itself lives in ``non_po_analysis`` and is re-exported here;
+this module adds the Streamlit caching, download buttons and charts used by
+``non_po_payment_dashboard.py``.
 
 Modules:
     os: Provides a way of using operating system dependent functionality
     like reading or writing to the file system.
     re: Offers a set of functions that allows us to search a string for
      a match (regular expressions).
-    difflib: Provides tools for comparing sequences, especially useful
-    for comparing text files.
-    pandas: A powerful data manipulation and analysis library for Python.
-    Here it's used to read and manipulate Excel data.
     plotly.express: A high-level interface to Plotly, a graphing library.
     It's used for creating interactive plots and visualizations.
     streamlit: A framework for creating web apps in pure Python. Used for
     displaying and interacting with data and visualizations in a web interface.
+    non_po_analysis: Loading, normalising, exception rules and exports.
 """
 import os
 import re
-import difflib
-import pandas as pd
 import plotly.express as px
 import streamlit as st
+from non_po_analysis import *
+
+# Holiday calendar workbook, resolved against the launch directory before the
+# working directory moves to this module's folder; see ``holiday_calendar``.
+HOLIDAY_FILE = os.path.abspath("unlocked holiday.xlsx")
 
-# Read holiday data from Excel file
-dfholiday = pd.read_excel("unlocked holiday.xlsx")
-dfholiday2 = pd.read_excel("unlocked holiday.xlsx")
+# Number of trend tables and figures kept by each chart cache.
+CHART_CACHE_ENTRIES = 64
 
 # Styles for cards
 directory = os.path.dirname(__file__)
 os.chdir(directory)
 
 
+def export_buttons(sheets, file_name, key):
+    """
+    Show download buttons that build the export only when clicked.
+
+    The Excel button exports every sheet; the CSV and Parquet buttons
+    export the last sheet (the raw data), which is the one that gets large;
+    the Parquet button is shown only when a Parquet engine is installed.
+
+    Args:
+        sheets (dict): Maps sheet names to the frames to export.
+        file_name (str): Name of the Excel file, e.g. "Remarks.xlsx".
+        key (str): Unique prefix for the button keys.
+    """
+    # Snapshot the frames: the files are built after the script has moved on
+    sheets = {name: df.copy(deep=False) for name, df in sheets.items()}
+    data = list(sheets.values())[-1]
+    stem = os.path.splitext(file_name)[0]
+    excel_col, csv_col, parquet_col = st.columns(3)
+    excel_col.download_button(
+        "Download Excel file",
+        data=lambda: write_workbook(sheets),
+        file_name=file_name,
+        mime=XLSX_MIME,
+        key=f"{key}_xlsx",
+        on_click="ignore",
+    )
+    csv_col.download_button(
+        "Download CSV",
+        data=lambda: to_display(data).to_csv(index=False).encode("utf-8"),
+        file_name=f"{stem}.csv",
+        mime="text/csv",
+        key=f"{key}_csv",
+        on_click="ignore",
+    )
+    if not PARQUET_AVAILABLE:
+        return
+    parquet_col.download_button(
+        "Download Parquet",
+        data=lambda: write_parquet(data),
+        file_name=f"{stem}.parquet",
+        mime="application/octet-stream",
+        key=f"{key}_parquet",
+        on_click="ignore",
+    )
+
+
 @st.cache_resource(show_spinner=False)
 def process_data(files):
     """
-    Process Excel files containing non-PO payment data.
+    Process an Excel file containing non-PO payment data.
 
     Args:
-    - files (list): List of file paths or file objects (xlsx format)
-    containing non-PO payment data.
+    - files: Path or file object (xlsx format) containing non-PO payment
+    data.
 
     Returns:
-    - pandas.DataFrame: Concatenated DataFrame containing processed
-    non-PO payment data.
+    - pandas.DataFrame: The frame from ``read_extract``, cached per file and
+    shared by every tab.
+    """
+    return read_extract(files)
 
-    This function reads each Excel file from the provided list, processes them
-    into a standardized format,
-    and concatenates them into a single DataFrame for further analysis.
 
+@st.cache_resource(show_spinner=False)
+def file_cube(file):
     """
-    data = pd.read_excel(files)
-    df = data.copy()
-    filtered_df = df.copy()
-    filtered_df["Time"] = pd.to_datetime(
-        filtered_df["Time"], format="%H:%M:%S", errors="coerce"
-    )
-    filtered_df["Updated at"] = pd.to_datetime(
-        filtered_df["Updated at"], format="%H:%M:%S", errors="coerce"
-    )
-    filtered_df["Verified at"] = pd.to_datetime(
-        filtered_df["Verified at"], format="%H:%M:%S", errors="coerce"
-    )
-    filtered_df["HOG Approval at"] = pd.to_datetime(
-        filtered_df["HOG Approval at"], format="%H:%M:%S", errors="coerce"
-    )
-    filtered_df["Doc. Date"] = pd.to_datetime(
-        filtered_df["Doc. Date"], errors="coerce")
-    filtered_df["Pstng Date"] = pd.to_datetime(
-        filtered_df["Pstng Date"], errors="coerce"
-    )
-    filtered_df["On"] = pd.to_datetime(filtered_df["On"], errors="coerce")
-    filtered_df["Updated on"] = pd.to_datetime(
-        filtered_df["Updated on"], errors="coerce"
-    )
-    filtered_df["Verified on"] = pd.to_datetime(
-        filtered_df["Verified on"], errors="coerce"
-    )
-    filtered_df["HOG Approval on"] = pd.to_datetime(
-        filtered_df["HOG Approval on"], errors="coerce"
-    )
-    filtered_df["Clearing date"] = pd.to_datetime(
-        filtered_df["Clearing date"], errors="coerce"
+    Build the aggregation cube of one uploaded file.
+
+    Cubes are cached per file, so adding a new month's file to the upload
+    only parses and aggregates that file; see ``combine_cubes``.
+
+    Args:
+        file: Path or file object accepted by ``process_data``.
+
+    Returns:
+        pd.DataFrame: Cube returned by ``build_cube``.
+    """
+    return build_cube(process_data(file))
+
+
+@st.cache_resource(show_spinner=False, max_entries=CHART_CACHE_ENTRIES)
+def trend_table(fingerprint, filters, _cube):
+    """
+    Roll the filtered cube up into the yearly trend of each category.
+
+    The cache is keyed on the dataset fingerprint and the filter selections
+    only; the leading underscore keeps Streamlit from hashing ``_cube``.
+
+    Args:
+        fingerprint (tuple): Dataset identity from ``data_fingerprint``.
+        filters (tuple): The selections ``_cube`` was filtered with.
+        _cube (pd.DataFrame): Cube from ``build_cube`` filtered by
+        ``filters``.
+
+    Returns:
+        pd.DataFrame: "category", "year", "Amount" and "Transactions", one
+        row per category and year.
+    """
+    return (
+        _cube.groupby(["category", "year"], observed=True)[["Amount", "Transactions"]]
+        .sum()
+        .reset_index()
     )
-    filtered_df["year"] = filtered_df["Pstng Date"].dt.year
-    filtered_df["Doc. Date"] = filtered_df["Doc. Date"].dt.date
-    filtered_df["Pstng Date"] = filtered_df["Pstng Date"].dt.date
-    filtered_df["On"] = filtered_df["On"].dt.date
-    filtered_df["Updated on"] = filtered_df["Updated on"].dt.date
-    filtered_df["Verified on"] = filtered_df["Verified on"].dt.date
-    filtered_df["HOG Approval on"] = filtered_df["HOG Approval on"].dt.date
-    filtered_df["Clearing date"] = filtered_df["Clearing date"].dt.date
-    filtered_df["Time"] = filtered_df["Time"].dt.time
-    filtered_df["Updated at"] = filtered_df["Updated at"].dt.time
-    filtered_df["Verified at"] = filtered_df["Verified at"].dt.time
-    filtered_df["HOG Approval at"] = filtered_df["HOG Approval at"].dt.time
-    filtered_df.drop(columns=["Year"], inplace=True)
-    df = filtered_df.copy()
-    df.reset_index(drop=True, inplace=True)
-    df["Vendor"] = df["Vendor"].astype(str)
-    df["G/L"] = df["G/L"].astype(str)
-    df["G/L"] = df["G/L"].apply(lambda x: str(x) if isinstance(x, str) else "")
-    df["G/L"] = df["G/L"].apply(lambda x: re.sub(r"\..*", "", x))
-    df.reset_index(drop=True, inplace=True)
-    return df
+
+
+@st.cache_resource(show_spinner=False)
+def holiday_calendar(path=HOLIDAY_FILE):
+    """
+    Load the holiday calendar once per process.
+
+    Args:
+        path (str, optional): Workbook with a "date" column. Defaults to
+        ``HOLIDAY_FILE``.
+
+    Returns:
+        np.ndarray: Calendar from ``load_holiday_calendar``.
+    """
+    return load_holiday_calendar(path)
 
 
 def format_amount(amount):
@@ -138,21 +186,6 @@ def format_amount(amount):
         return f"₹ {amount:,.2f}"
 
 
-@st.cache_resource(show_spinner=False)
-def has_special_characters(s):
-    """
-    Check if a string contains any special characters.
-
-    Args:
-        s (str): The string to check.
-
-    Returns:
-        bool: True if the string contains any special characters, False otherwise.
-
-    """
-    return re.search(r"[^A-Za-z0-9]+", s) is not None
-
-
 @st.cache_resource(show_spinner=False)
 def is_similar(s1, s2):
     """
@@ -176,14 +209,14 @@ def is_similar(s1, s2):
 
 
 
-@st.cache_resource(show_spinner=False)
+@st.cache_resource(show_spinner=False, max_entries=CHART_CACHE_ENTRIES)
 def line_plot_overall_transactions(data, category, years, width=400, height=300):
     """
     Create a line plot showing the count of transactions over
      the specified years for a given category.
 
     Args:
-        data (pd.DataFrame): The input data containing transaction records.
+        data (pd.DataFrame): Trend table from ``trend_table``.
         category (str): The category of transactions to filter by.
         years (list of int): The years to include in the plot.
         width (int, optional): The width of the plot. Defaults to 400.
@@ -195,7 +228,9 @@ def line_plot_overall_transactions(data, category, years, width=400, height=300)
 
     """
     filtered_data = data[(data["category"] == category) & (data["year"].isin(years))]
-    data_length = filtered_data.groupby("year").size().reset_index(name="data_len")
+    data_length = filtered_data[["year", "Transactions"]].rename(
+        columns={"Transactions": "data_len"}
+    )
 
     # Create the line plot
     fig = px.line(
@@ -236,14 +271,14 @@ def line_plot_overall_transactions(data, category, years, width=400, height=300)
     return fig
 
 
-@st.cache_resource(show_spinner=False)
+@st.cache_resource(show_spinner=False, max_entries=CHART_CACHE_ENTRIES)
 def line_plot_used_amount(data, category, years, width=400, height=300):
     """
     Create a line plot showing the total amount of transactions over
      the specified years for a given category.
 
     Args:
-        data (pd.DataFrame): The input data containing transaction records.
+        data (pd.DataFrame): Trend table from ``trend_table``.
         category (str): The category of transactions to filter by.
         years (list of int): The years to include in the plot.
         width (int, optional): The width of the plot. Defaults to 400.
@@ -256,9 +291,8 @@ def line_plot_used_amount(data, category, years, width=400, height=300):
     # Filter the data
     data = data[(data["category"] == category) & (data["year"].isin(years))]
 
-    # Group by year and sum the amounts
-    amount_length = (
-        data.groupby("year")["Amount"].sum().reset_index(name="amount_length")
+    amount_length = data[["year", "Amount"]].rename(
+        columns={"Amount": "amount_length"}
     )
 
     # Create the line plot
@@ -322,415 +356,16 @@ def line_plot_used_amount(data, category, years, width=400, height=300):
 
 
 
-@st.cache_resource(show_spinner=False)
-def check_similarity(s1, s2, threshold=0.8):
+@st.cache_resource(show_spinner=False, max_entries=CHART_CACHE_ENTRIES)
+def exception_memo(fingerprint):
     """
-    Check if two strings are similar based on a similarity threshold.
-
-    Parameters:
-    - s1 (str): First string to compare.
-    - s2 (str): Second string to compare.
-    - threshold (float, optional): Minimum similarity ratio to consider strings similar.
-    Defaults to 0.8.
-
-    Returns:
-    - bool: True if the similarity ratio between s1 and s2 is greater than or equal
-    to the threshold, False otherwise.
-    """
-    s1 = str(s1)
-    s2 = str(s2)
-    similarity = difflib.SequenceMatcher(None, s1, s2).ratio()
-    return similarity >= threshold
-
-
-def filter_auth(filtered_df, checked_columns_auth, filename):
-    """
-    Filter DataFrame based on checked authorization columns and sort results.
-
-    Parameters:
-    - filtered_df (pd.DataFrame): DataFrame to filter.
-    - checked_columns_auth (list): List of column names to check for authorization.
-    - filename (str): Name of the output file.
-
-    Returns:
-    - tuple or None: Tuple containing filtered DataFrame, checked columns list,
-    and filename if successful,
-      or None, None, None if an error occurs.
-    """
-    if len(checked_columns_auth) == 1:
-        st.error("Please select another checkbox to verify Authorization Parameters.")
-        return None, None, None
-
-    for i in range(len(checked_columns_auth) - 1):
-        col_i = checked_columns_auth[i]
-        col_j = checked_columns_auth[i + 1]
-        filtered_df = filtered_df[filtered_df[col_i] == filtered_df[col_j]]
-
-    sort_columns = checked_columns_auth.copy()
-    if "Reimbursement ID" not in checked_columns_auth and "Cost Center" not in checked_columns_auth:
-        sort_columns += ["Reimbursement ID", "Cost Center"]
-    elif "Reimbursement ID" in checked_columns_auth and "Cost Center" not in checked_columns_auth:
-        sort_columns += ["Cost Center"]
-    elif "Cost Center" in checked_columns_auth and "Reimbursement ID" not in checked_columns_auth:
-        sort_columns += ["Reimbursement ID"]
-
-    filtered_df = filtered_df.sort_values(by=sort_columns)
-    filtered_df.reset_index(drop=True, inplace=True)
-    filtered_df.index += 1
-
-    filename = "Transactions_with_same_column.xlsx"
-
-    try:
-        return filtered_df, checked_columns_auth, filename
-    except FileNotFoundError as e:
-        # Handle specific exception (e.g., file not found)
-        st.error(f"File not found: {e}")
-        return None, None, None
-
-
-def filter_gen(filtered_df, checked_columns_gen, filename):
-    """
-    Filter and sort DataFrame based on checked columns.
-
-    Parameters:
-    - filtered_df (pd.DataFrame): DataFrame to filter.
-    - checked_columns_gen (list): List of columns to check for duplicates.
-    - filename (str): Filename to save results.
-
-    Returns:
-    - pd.DataFrame or None: Filtered DataFrame, checked_columns_gen, filename.
-    """
-    filtered_df = filtered_df[
-        filtered_df.duplicated(subset=checked_columns_gen, keep=False)
-    ]
-
-    sort_columns = checked_columns_gen.copy()
-    if "Reimbursement ID" not in checked_columns_gen and "Cost Center" not in checked_columns_gen:
-        sort_columns += ["Reimbursement ID", "Cost Center"]
-    elif "Reimbursement ID" in checked_columns_gen and "Cost Center" not in checked_columns_gen:
-        sort_columns += ["Cost Center"]
-    elif "Cost Center" in checked_columns_gen and "Reimbursement ID" not in checked_columns_gen:
-        sort_columns += ["Reimbursement ID"]
-
-    filtered_df = filtered_df.sort_values(by=sort_columns)
-    filtered_df.reset_index(drop=True, inplace=True)
-    filtered_df.index += 1
-
-    filename = "Transactions_with_same_column.xlsx"
-
-    try:
-        return filtered_df, checked_columns_gen, filename
-
-    except pd.errors.EmptyDataError as e:
-        st.error(f"An error occurred: {e}")
-        return None, None, None
-
-
-def filter_spec(filtered_df, checked_columnsspec, dfholiday, filename):
-    """
-    Filter the dataframe based on specified columns and holiday dates,
-     and perform various transformations
-    including finding similar invoices and handling special characters
-     in invoice numbers.
+    Hold the evaluated exception rules of one dataset.
 
     Args:
-        filtered_df (pd.DataFrame): The dataframe to be filtered and processed.
-        checked_columnsspec (list of str): The columns based on which
-        filtering and processing will be applied.
-        dfholiday (pd.DataFrame): The dataframe containing holiday dates.
-        filename (str): The filename for saving the processed dataframe.
+        fingerprint (tuple): Dataset identity from ``data_fingerprint``.
 
     Returns:
-        pd.DataFrame: The filtered and processed dataframe.
-        list of str: The updated list of checked columns.
-        pd.DataFrame: The dataframe containing holiday dates.
-        str: The filename for saving the processed dataframe.
-
-    Raises:
-        Exception: If an error occurs during processing, an error message
-         is displayed and None is returned
-                   for all return values.
-
+        dict: Rule results keyed by rule and columns, filled by
+        ``memoised`` and passed to ``exception_mask``.
     """
-    filtered_df["Invoice Number"] = filtered_df["Invoice Number"].astype(str)
-    if "Holiday Transactions" in checked_columnsspec:
-        if len(checked_columnsspec) == 1:
-            filtered_df["Document Date"] = pd.to_datetime(
-                filtered_df["Document Date"], format="%Y/%m/%d", errors="coerce"
-            )
-            filtered_df["Posting Date"] = pd.to_datetime(
-                filtered_df["Posting Date"], format="%Y/%m/%d", errors="coerce"
-            )
-            filtered_df["Verified on"] = pd.to_datetime(
-                filtered_df["Verified on"], format="%Y/%m/%d", errors="coerce"
-            )
-            dfholiday["date"] = pd.to_datetime(
-                dfholiday["date"], format="%Y/%m/%d", errors="coerce"
-            )
-            filtered_df = filtered_df[
-                filtered_df["Posting Date"].isin(dfholiday["date"])
-            ]
-            checked_columnsspec = [
-                (
-                    "Posting Date"
-                    if col == "Holiday Transactions"
-                    else (
-                        "Invoice Number"
-                        if col in ("Inv-Special Character", "80 % Same Invoice")
-                        else col
-                    )
-                )
-                for col in checked_columnsspec
-            ]
-        elif (
-            len(checked_columnsspec) == 2
-            and "Inv-Special Character" in checked_columnsspec
-        ):
-            filtered_df["Document Date"] = pd.to_datetime(
-                filtered_df["Document Date"], format="%Y/%m/%d", errors="coerce"
-            )
-            filtered_df["Posting Date"] = pd.to_datetime(
-                filtered_df["Posting Date"], format="%Y/%m/%d", errors="coerce"
-            )
-            filtered_df["Verified on"] = pd.to_datetime(
-                filtered_df["Verified on"], format="%Y/%m/%d", errors="coerce"
-            )
-            dfholiday["date"] = pd.to_datetime(
-                dfholiday["date"], format="%Y/%m/%d", errors="coerce"
-            )
-            filtered_df = filtered_df[
-                filtered_df["Posting Date"].isin(dfholiday["date"])
-            ]
-            filtered_df = filtered_df.sort_values(
-                by=["Invoice Number", "Posting Date"])
-            filtered_df = filtered_df[
-                ~filtered_df.duplicated(subset="Invoice Number", keep="last")
-            ]
-
-            # Find similar invoices without grouping
-            similar_invoices = set()
-            invoice_pairs = [
-                (invoice, re.sub(r"[^A-Za-z0-9]+", "", str(invoice)))
-                for invoice in filtered_df["Invoice Number"]
-            ]
-            for i, (inv1, clean_inv1) in enumerate(invoice_pairs):
-                for inv2, clean_inv2 in invoice_pairs[i + 1:]:
-                    if is_similar(clean_inv1, clean_inv2):
-                        similar_invoices.add(inv1)
-                        similar_invoices.add(inv2)
-
-            # Filter dataframe to keep only similar invoices
-            filtered_df = filtered_df[
-                filtered_df["Invoice Number"].isin(similar_invoices)
-            ]
-            checked_columnsspec = [
-                (
-                    "Posting Date"
-                    if col == "Holiday Transactions"
-                    else (
-                        "Invoice Number"
-                        if col in ("Inv-Special Character", "80 % Same Invoice")
-                        else col
-                    )
-                )
-                for col in checked_columnsspec
-            ]
-        elif (
-            len(checked_columnsspec) == 2 and "80 % Same Invoice" in checked_columnsspec
-        ):
-            filtered_df["Document Date"] = pd.to_datetime(
-                filtered_df["Document Date"], format="%Y/%m/%d", errors="coerce"
-            )
-            filtered_df["Posting Date"] = pd.to_datetime(
-                filtered_df["Posting Date"], format="%Y/%m/%d", errors="coerce"
-            )
-            filtered_df["Verified on"] = pd.to_datetime(
-                filtered_df["Verified on"], format="%Y/%m/%d", errors="coerce"
-            )
-            dfholiday["date"] = pd.to_datetime(
-                dfholiday["date"], format="%Y/%m/%d", errors="coerce"
-            )
-            filtered_df = filtered_df[
-                filtered_df["Posting Date"].isin(dfholiday["date"])
-            ]
-            filtered_df["Invoice Number"] = filtered_df["Invoice Number"].astype(
-                str)
-            filtered_df["check_similarity"] = False
-            for i in range(len(filtered_df)):
-                for j in range(i + 1, len(filtered_df)):
-                    invoice1 = filtered_df.iloc[i]["Invoice Number"]
-                    invoice2 = filtered_df.iloc[j]["Invoice Number"]
-                    if is_similar(invoice1, invoice2):
-                        filtered_df.at[i, "check_similarity"] = True
-                        filtered_df.at[j, "check_similarity"] = True
-            filtered_df = filtered_df[filtered_df["check_similarity"]]
-            checked_columnsspec = [
-                (
-                    "Posting Date"
-                    if col == "Holiday Transactions"
-                    else (
-                        "Invoice Number"
-                        if col in ("Inv-Special Character", "80 % Same Invoice")
-                        else col
-                    )
-                )
-                for col in checked_columnsspec
-            ]
-        else:
-            filtered_df["Document Date"] = pd.to_datetime(
-                filtered_df["Document Date"], format="%Y/%m/%d", errors="coerce"
-            )
-            filtered_df["Posting Date"] = pd.to_datetime(
-                filtered_df["Posting Date"], format="%Y/%m/%d", errors="coerce"
-            )
-            filtered_df["Verified on"] = pd.to_datetime(
-                filtered_df["Verified on"], format="%Y/%m/%d", errors="coerce"
-            )
-            dfholiday["date"] = pd.to_datetime(
-                dfholiday["date"], format="%Y/%m/%d", errors="coerce"
-            )
-            filtered_df = filtered_df[
-                filtered_df["Posting Date"].isin(dfholiday["date"])
-            ]
-            filtered_df = filtered_df.sort_values(
-                by=["Invoice Number", "Posting Date"])
-            filtered_df = filtered_df[
-                ~filtered_df.duplicated(subset="Invoice Number", keep="last")
-            ]
-
-            # Find similar invoices without grouping
-            similar_invoices = set()
-            invoice_pairs = [
-                (invoice, re.sub(r"[^A-Za-z0-9]+", "", str(invoice)))
-                for invoice in filtered_df["Invoice Number"]
-            ]
-            for i, (inv1, clean_inv1) in enumerate(invoice_pairs):
-                for inv2, clean_inv2 in invoice_pairs[i + 1:]:
-                    if is_similar(clean_inv1, clean_inv2):
-                        similar_invoices.add(inv1)
-                        similar_invoices.add(inv2)
-
-            # Filter dataframe to keep only similar invoices
-            filtered_df = filtered_df[
-                filtered_df["Invoice Number"].isin(similar_invoices)
-            ]
-            filtered_df["Invoice Number"] = filtered_df["Invoice Number"].astype(
-                str)
-            filtered_df["check_similarity"] = False
-            for i in range(len(filtered_df)):
-                for j in range(i + 1, len(filtered_df)):
-                    invoice1 = filtered_df.iloc[i]["Invoice Number"]
-                    invoice2 = filtered_df.iloc[j]["Invoice Number"]
-                    if is_similar(invoice1, invoice2):
-                        filtered_df.at[i, "check_similarity"] = True
-                        filtered_df.at[j, "check_similarity"] = True
-            filtered_df = filtered_df[filtered_df["check_similarity"]]
-    elif "80 % Same Invoice" in checked_columnsspec:
-        if len(checked_columnsspec) == 1:
-            filtered_df["Invoice Number"] = filtered_df["Invoice Number"].astype(
-                str)
-            filtered_df["check_similarity"] = False
-            for i in range(len(filtered_df)):
-                for j in range(i + 1, len(filtered_df)):
-                    invoice1 = filtered_df.iloc[i]["Invoice Number"]
-                    invoice2 = filtered_df.iloc[j]["Invoice Number"]
-                    if is_similar(invoice1, invoice2):
-                        filtered_df.at[i, "check_similarity"] = True
-                        filtered_df.at[j, "check_similarity"] = True
-            filtered_df = filtered_df[filtered_df["check_similarity"]]
-        else:
-            filtered_df = filtered_df.sort_values(
-                by=["Invoice Number", "Posting Date"])
-            filtered_df = filtered_df[
-                ~filtered_df.duplicated(subset="Invoice Number", keep="last")
-            ]
-
-            # Find similar invoices without grouping
-            similar_invoices = set()
-            invoice_pairs = [
-                (invoice, re.sub(r"[^A-Za-z0-9]+", "", str(invoice)))
-                for invoice in filtered_df["Invoice Number"]
-            ]
-            for i, (inv1, clean_inv1) in enumerate(invoice_pairs):
-                for inv2, clean_inv2 in invoice_pairs[i + 1:]:
-                    if is_similar(clean_inv1, clean_inv2):
-                        similar_invoices.add(inv1)
-                        similar_invoices.add(inv2)
-
-            # Filter dataframe to keep only similar invoices
-            filtered_df = filtered_df[
-                filtered_df["Invoice Number"].isin(similar_invoices)
-            ]
-            filtered_df["Invoice Number"] = filtered_df["Invoice Number"].astype(
-                str)
-            filtered_df["check_similarity"] = False
-            for i in range(len(filtered_df)):
-                for j in range(i + 1, len(filtered_df)):
-                    invoice1 = filtered_df.iloc[i]["Invoice Number"]
-                    invoice2 = filtered_df.iloc[j]["Invoice Number"]
-                    if is_similar(invoice1, invoice2):
-                        filtered_df.at[i, "check_similarity"] = True
-                        filtered_df.at[j, "check_similarity"] = True
-            filtered_df = filtered_df[filtered_df["check_similarity"]]
-    elif "Inv-Special Character" in checked_columnsspec:
-        if len(checked_columnsspec) == 1:
-            filtered_df = filtered_df.sort_values(
-                by=["Invoice Number", "Posting Date"])
-            filtered_df = filtered_df[
-                ~filtered_df.duplicated(subset="Invoice Number", keep="last")
-            ]
-
-            # Find similar invoices without grouping
-            similar_invoices = set()
-            invoice_pairs = [
-                (invoice, re.sub(r"[^A-Za-z0-9]+", "", str(invoice)))
-                for invoice in filtered_df["Invoice Number"]
-            ]
-            for i, (inv1, clean_inv1) in enumerate(invoice_pairs):
-                for inv2, clean_inv2 in invoice_pairs[i + 1:]:
-                    if is_similar(clean_inv1, clean_inv2):
-                        similar_invoices.add(inv1)
-                        similar_invoices.add(inv2)
-
-            # Filter dataframe to keep only similar invoices
-            filtered_df = filtered_df[
-                filtered_df["Invoice Number"].isin(similar_invoices)
-            ]
-
-    checked_columnsspec = [
-        (
-            "Posting Date"
-            if col == "Holiday Transactions"
-            else (
-                "Invoice Number"
-                if col in ("Inv-Special Character", "80 % Same Invoice")
-                else col
-            )
-        )
-        for col in checked_columnsspec
-    ]
-    sort_columns = checked_columnsspec.copy()
-    if (
-        "Reimbursement ID" not in checked_columnsspec
-        and "Cost Center" not in checked_columnsspec
-    ):
-        sort_columns += ["Reimbursement ID", "Cost Center"]
-    elif (
-        "Reimbursement ID" in checked_columnsspec
-        and "Cost Center" not in checked_columnsspec
-    ):
-        sort_columns += ["Cost Center"]
-    elif (
-        "Cost Center" in checked_columnsspec
-        and "Reimbursement ID" not in checked_columnsspec
-    ):
-        sort_columns += ["Reimbursement ID"]
-    filtered_df = filtered_df.sort_values(by=sort_columns)
-    filtered_df.reset_index(drop=True, inplace=True)
-    filtered_df.index += 1
-    try:
-        return filtered_df, checked_columnsspec, dfholiday, filename
-
-    except pd.errors.EmptyDataError as e:
-        st.error(f"An error occurred: {e}")
-        return None, None, None, None
+    return {}
@@ -0,0 +1,647 @@
+"""
+Concurrent, cached GST number lookups on knowyourgst.com.
+
+Looks up a list of company names (e.g. the NAME column of the vendor
+master used by Knowyourgst.ipynb) through one pooled ``requests.Session``
+from a bounded thread pool. Requests to a host are spaced by a rate limit
+and failed requests are retried with exponential backoff. Pages are
+parsed with precompiled XPath into a GSTRecord (GSTIN, business name,
+address, status) in a process pool, off the request threads. Every
+finished lookup and its record are stored in a SQLite cache keyed on the
+normalised name or GSTIN, so an interrupted run resumes where it stopped
+and a re-run over an updated vendor master fetches only the new names and
+those older than the TTL. ``base_url`` points the client at
+another server, e.g. a local stub for testing.
+
+Example:
+    python gst_lookup.py FILE1.xlsx --column NAME --cache gst_cache.db --ttl-days 30
+
+Modules:
+    argparse: Parses the command line.
+    re: Normalises names and recognises GSTINs.
+    sqlite3: Stores the lookup cache.
+    threading: Serialises the rate limiter.
+    time: Spaces the requests and timestamps the cache.
+    concurrent.futures: Runs the lookups on a bounded thread pool and
+        parses the pages in a process pool.
+    typing: Declares the GSTRecord fields.
+    urllib.parse: Quotes names into the search URL and reads its host.
+    requests: Pooled HTTP session with retrying adapters.
+    lxml: Parses the search pages.
+    pandas: Reads the vendor master and writes the addresses.
+"""
+import argparse
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from typing import NamedTuple
+from urllib.parse import quote, urlsplit
+
+import pandas as pd
+import requests
+from lxml import etree
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+BASE_URL = "https://www.knowyourgst.com"
+SEARCH_PATH = "/gst-number-search/by-name-pan/{query}/"
+# Responses retried with exponential backoff; 429 and 503 also honour the
+# server's Retry-After header.
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Finished lookups, keyed on the normalised name or GSTIN with the time
+# they were fetched, so re-running over an updated vendor master requests
+# only the new names and those older than the TTL.
+GST_CACHE_DB = "gst_cache.db"
+CACHE_TTL = 30 * 86400
+GSTIN_PATTERN = re.compile(r"\d{2}[A-Z]{5}\d{4}[A-Z][1-9A-Z]Z[0-9A-Z]")
+
+
+class GSTRecord(NamedTuple):
+    """One registration listed on a GST search page."""
+
+    gstin: str = None
+    business_name: str = None
+    address: str = None
+    status: str = None
+
+
+# Row labels of the search page -> GSTRecord fields.
+RECORD_FIELDS = {
+    "GSTIN": "gstin",
+    "Business Name": "business_name",
+    "Address": "address",
+    "Status": "status",
+}
+# Parsed registrations are cached next to their page; "address" is already
+# a column of the lookups table.
+RECORD_COLUMNS = {
+    "gstin": "TEXT",
+    "business_name": "TEXT",
+    "gst_status": "TEXT",
+    "found": "INTEGER",
+    "parsed_at": "REAL",
+}
+# Compiled once and reused for every page.
+FIELD_ROWS = etree.XPath("//tr[count(td) = 2]")
+ROW_LABEL = etree.XPath("normalize-space(td[1])")
+ROW_VALUE = etree.XPath("normalize-space(td[2])")
+ROW_TABLE = etree.XPath("ancestor::table[1]")
+
+
+def make_session(pool_size=8, retries=3, backoff=0.5):
+    """
+    A session whose connections are reused across lookups and threads.
+
+    Args:
+        pool_size (int): Connections kept open per host; match the workers.
+        retries (int): Retries of a failed connection or retryable status.
+        backoff (float): Base of the exponential backoff in seconds.
+
+    Returns:
+        requests.Session: The configured session.
+    """
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=Retry(
+            total=retries,
+            backoff_factor=backoff,
+            status_forcelist=RETRY_STATUSES,
+            allowed_methods=["GET"],
+            raise_on_status=False,
+        ),
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def rate_limiter(rate):
+    """
+    A per-host limiter shared by the lookup threads.
+
+    Args:
+        rate (float): Requests per second allowed to each host.
+
+    Returns:
+        function: ``wait(url)`` that sleeps until the url's host may be
+            requested again.
+    """
+    lock = threading.Lock()
+    next_slot = {}
+
+    def wait(url):
+        host = urlsplit(url).netloc
+        with lock:
+            now = time.monotonic()
+            slot = max(now, next_slot.get(host, now))
+            next_slot[host] = slot + 1 / rate
+        if slot > now:
+            time.sleep(slot - now)
+
+    return wait
+
+
+def search_url(company_name, base_url=BASE_URL):
+    """
+    URL of the search-by-name page of a company.
+
+    Args:
+        company_name (str): Business name, PAN or GSTIN.
+        base_url (str): Scheme and host of the site.
+
+    Returns:
+        str: The quoted search URL.
+    """
+    query = quote(company_name, safe="")
+    return base_url.rstrip("/") + SEARCH_PATH.format(query=query)
+
+
+def fetch(company_name, session, base_url=BASE_URL, wait=None, timeout=30):
+    """
+    Request the search page of one company.
+
+    Args:
+        company_name (str): Business name, PAN or GSTIN.
+        session (requests.Session): Session from ``make_session``.
+        base_url (str): Scheme and host of the site.
+        wait (function, optional): Limiter from ``rate_limiter``.
+        timeout (float): Seconds to wait for the server.
+
+    Returns:
+        tuple: HTTP status and the page text, or None and the error
+            message if the request failed.
+    """
+    url = search_url(company_name, base_url)
+    if wait is not None:
+        wait(url)
+    try:
+        response = session.get(url, timeout=timeout)
+    except requests.exceptions.RequestException as e:
+        return None, f"An error occurred: {str(e)}"
+    return response.status_code, response.text
+
+
+def send_request(
+    company_name,
+    session=None,
+    base_url=BASE_URL,
+    cache_path=GST_CACHE_DB,
+    ttl=CACHE_TTL,
+):
+    """
+    Look up one company, as the notebook did before the batch client.
+
+    Args:
+        company_name (str): Business name, PAN or GSTIN.
+        session (requests.Session, optional): Session to reuse.
+        base_url (str): Scheme and host of the site.
+        cache_path (str, optional): Lookup cache; None to always fetch.
+        ttl (float): Seconds a cached lookup stays fresh.
+
+    Returns:
+        str: The page text, or a message saying why the lookup failed.
+    """
+    status, text = lookup_all(
+        [company_name],
+        cache_path=cache_path,
+        ttl=ttl,
+        base_url=base_url,
+        workers=1,
+        session=session,
+    )[company_name]
+    if status is None or status == 200:
+        return text
+    return f"Request failed with status code {status}"
+
+
+def is_final(status):
+    """Whether a lookup's outcome will not change by asking again."""
+    return status is not None and status < 500 and status != 429
+
+
+def cache_key(query):
+    """
+    Key under which a lookup is cached.
+
+    A GSTIN is keyed as is; a company name is lower-cased with punctuation
+    and repeated spaces collapsed, so "Chennai Polymers Pvt. Ltd." and
+    "chennai polymers pvt ltd" share one lookup.
+
+    Args:
+        query (str): Business name, PAN or GSTIN.
+
+    Returns:
+        str: "gstin:<GSTIN>" or "name:<normalised name>".
+    """
+    query = query.strip()
+    if GSTIN_PATTERN.fullmatch(query.upper()):
+        return "gstin:" + query.upper()
+    return "name:" + " ".join(re.sub(r"[^0-9a-z]+", " ", query.lower()).split())
+
+
+def connect_gst_cache(db_path=GST_CACHE_DB):
+    """
+    Open the lookup cache, creating or upgrading its table on first use.
+
+    Args:
+        db_path (str): Path of the SQLite database file.
+
+    Returns:
+        sqlite3.Connection: Open connection to the cache.
+    """
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS lookups (key TEXT PRIMARY KEY, query TEXT, "
+        "status INTEGER, text TEXT, address TEXT, fetched_at REAL)"
+    )
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(lookups)")}
+    for column, kind in RECORD_COLUMNS.items():
+        if column not in columns:
+            conn.execute(f"ALTER TABLE lookups ADD COLUMN {column} {kind}")
+    return conn
+
+
+def read_cached(conn, keys, ttl):
+    """
+    Fresh cached lookups of the given keys.
+
+    Args:
+        conn (sqlite3.Connection): Lookup cache.
+        keys (iterable): Cache keys wanted.
+        ttl (float): Seconds a cached lookup stays fresh.
+
+    Returns:
+        dict: Key -> (status, text) of the keys fetched within ``ttl``.
+    """
+    keys = set(keys)
+    rows = conn.execute(
+        "SELECT key, status, text FROM lookups WHERE fetched_at >= ?",
+        (time.time() - ttl,),
+    )
+    return {key: (status, text) for key, status, text in rows if key in keys}
+
+
+def iter_lookups(
+    queries,
+    conn=None,
+    ttl=CACHE_TTL,
+    base_url=BASE_URL,
+    workers=8,
+    rate=4.0,
+    timeout=30,
+    session=None,
+):
+    """
+    Lazily look up companies concurrently, skipping fresh cached lookups.
+
+    Keys fetched within ``ttl`` are read from the cache and yielded first;
+    the rest are requested and yielded, and stored, as they complete, so an
+    interrupted run resumes where it stopped. Lookups that failed or hit a
+    server error are not stored and are requested again by the next run.
+
+    Args:
+        queries (dict): Cache key -> company name, PAN or GSTIN to send.
+        conn (sqlite3.Connection, optional): Lookup cache.
+        ttl (float): Seconds a cached lookup stays fresh.
+        base_url (str): Scheme and host of the site.
+        workers (int): Lookups in flight at once.
+        rate (float): Requests per second to the host.
+        timeout (float): Seconds to wait for the server per request.
+        session (requests.Session, optional): Session to reuse; one with
+            ``workers`` pooled connections by default.
+
+    Yields:
+        tuple: Cache key, status code (None on failure) and page text or
+            error message, once per key.
+    """
+    cached = read_cached(conn, queries, ttl) if conn else {}
+    for key, (status, text) in cached.items():
+        yield key, status, text
+    pending = [key for key in queries if key not in cached]
+    if not pending:
+        return
+    session = session or make_session(workers)
+    wait = rate_limiter(rate)
+    pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = {
+            pool.submit(fetch, queries[key], session, base_url, wait, timeout): key
+            for key in pending
+        }
+        for future in as_completed(futures):
+            key = futures[future]
+            status, text = future.result()
+            if conn and is_final(status):
+                conn.execute(
+                    "INSERT OR REPLACE INTO lookups (key, query, status, text, "
+                    "fetched_at) VALUES (?, ?, ?, ?, ?)",
+                    (key, queries[key], status, text, time.time()),
+                )
+                conn.commit()
+            yield key, status, text
+    finally:
+        # On an interrupt, drop the queued lookups instead of finishing them.
+        pool.shutdown(cancel_futures=True)
+
+
+def keyed_queries(names):
+    """
+    Cache keys of the names, and one name to send per key.
+
+    Args:
+        names (iterable): Company names, PANs or GSTINs.
+
+    Returns:
+        tuple: Name -> cache key, and cache key -> first name with that key.
+    """
+    keys = {name: cache_key(name) for name in names}
+    queries = {}
+    for name, key in keys.items():
+        queries.setdefault(key, name)
+    return keys, queries
+
+
+def lookup_all(names, cache_path=GST_CACHE_DB, **lookup_options):
+    """
+    Look up many companies concurrently, skipping fresh cached lookups.
+
+    Names are keyed with ``cache_key``, so spellings of one name are looked
+    up once.
+
+    Args:
+        names (iterable): Company names, PANs or GSTINs.
+        cache_path (str, optional): Lookup cache; None to fetch everything.
+        **lookup_options: Further arguments of ``iter_lookups``, e.g.
+            ``ttl``, ``base_url``, ``workers`` or ``rate``.
+
+    Returns:
+        dict: Name -> (status, text) for every name.
+    """
+    keys, queries = keyed_queries(names)
+    conn = connect_gst_cache(cache_path) if cache_path else None
+    try:
+        results = {
+            key: (status, text)
+            for key, status, text in iter_lookups(queries, conn, **lookup_options)
+        }
+    finally:
+        if conn:
+            conn.close()
+    return {name: results[key] for name, key in keys.items()}
+
+
+def parse_page(html_content):
+    """
+    Every registration listed on a GST search page, in one pass.
+
+    The page lists each registration as rows of a label cell and a value
+    cell. A registration ends where its table ends or where one of its
+    fields is listed a second time.
+
+    Args:
+        html_content (str): Page text from ``lookup_all``.
+
+    Returns:
+        list: GSTRecord of each registration, in page order.
+    """
+    root = etree.HTML(html_content) if html_content.strip() else None
+    if root is None:
+        return []
+    records = []
+    fields = {}
+    table = None
+    for row in FIELD_ROWS(root):
+        field = RECORD_FIELDS.get(ROW_LABEL(row).rstrip(":").strip())
+        if field is None:
+            continue
+        row_table = ROW_TABLE(row)
+        row_table = row_table[0] if row_table else None
+        if fields and (field in fields or row_table is not table):
+            records.append(GSTRecord(**fields))
+            fields = {}
+        table = row_table
+        fields[field] = ROW_VALUE(row)
+    if fields:
+        records.append(GSTRecord(**fields))
+    return records
+
+
+def extract_record(company_name, html_content):
+    """
+    Registration of the named business on a GST search page.
+
+    Args:
+        company_name (str): Business name or GSTIN as looked up.
+        html_content (str): Page text from ``lookup_all``.
+
+    Returns:
+        GSTRecord: The first matching registration, or None.
+    """
+    wanted = cache_key(company_name)
+    field = "gstin" if wanted.startswith("gstin:") else "business_name"
+    for record in parse_page(html_content):
+        if cache_key(getattr(record, field)) == wanted:
+            return record
+    return None
+
+
+def extract_address(company_name, html_content):
+    """
+    Address of the named business on a GST search page.
+
+    Args:
+        company_name (str): Business name as looked up.
+        html_content (str): Page text from ``lookup_all``.
+
+    Returns:
+        str: The address, or "Address not found.".
+    """
+    record = extract_record(company_name, html_content)
+    if record is None or not record.address:
+        return "Address not found."
+    return record.address
+
+
+def read_cached_records(conn, keys, ttl):
+    """
+    Parsed registrations of the fresh cached lookups of the given keys.
+
+    Args:
+        conn (sqlite3.Connection): Lookup cache.
+        keys (iterable): Cache keys wanted.
+        ttl (float): Seconds a cached lookup stays fresh.
+
+    Returns:
+        dict: Key -> GSTRecord, or None when the page did not list the
+            business, of the keys already parsed.
+    """
+    keys = set(keys)
+    rows = conn.execute(
+        "SELECT key, gstin, business_name, address, gst_status, found FROM lookups "
+        "WHERE parsed_at IS NOT NULL AND fetched_at >= ?",
+        (time.time() - ttl,),
+    )
+    return {
+        key: GSTRecord(*fields) if found else None
+        for key, *fields, found in rows
+        if key in keys
+    }
+
+
+def lookup_records(
+    names, cache_path=GST_CACHE_DB, parse_workers=None, **lookup_options
+):
+    """
+    Look up many companies and parse their registrations.
+
+    Pages are parsed in a process pool as their lookups complete, so the
+    request threads only fetch; pages parsed before are read from the
+    cache with their registration.
+
+    Args:
+        names (iterable): Company names, PANs or GSTINs.
+        cache_path (str, optional): Lookup cache; None to fetch everything.
+        parse_workers (int, optional): Parsing processes (default: all
+            cores).
+        **lookup_options: Further arguments of ``iter_lookups``.
+
+    Returns:
+        dict: Name -> (status, result), where result is the GSTRecord, None
+            when the page does not list the business, or a message saying
+            why the lookup failed.
+    """
+    keys, queries = keyed_queries(names)
+    conn = connect_gst_cache(cache_path) if cache_path else None
+    ttl = lookup_options.get("ttl", CACHE_TTL)
+    parsed = read_cached_records(conn, queries, ttl) if conn else {}
+    results = {}
+    pool = ProcessPoolExecutor(max_workers=parse_workers)
+    try:
+        futures = {}
+        for key, status, text in iter_lookups(queries, conn, **lookup_options):
+            if status is None:
+                results[key] = (status, text)
+            elif status != 200:
+                results[key] = (status, f"Request failed with status code {status}")
+            elif key in parsed:
+                results[key] = (status, parsed[key])
+            else:
+                futures[pool.submit(extract_record, queries[key], text)] = key
+        for future in as_completed(futures):
+            key = futures[future]
+            record = future.result()
+            results[key] = (200, record)
+            if conn:
+                conn.execute(
+                    "UPDATE lookups SET gstin = ?, business_name = ?, address = ?, "
+                    "gst_status = ?, found = ?, parsed_at = ? WHERE key = ?",
+                    (*(record or GSTRecord()), record is not None, time.time(), key),
+                )
+    finally:
+        pool.shutdown(cancel_futures=True)
+        if conn:
+            conn.commit()
+            conn.close()
+    return {name: results[key] for name, key in keys.items()}
+
+
+def lookup_addresses(names, cache_path=GST_CACHE_DB, **lookup_options):
+    """
+    Addresses of many companies.
+
+    Args:
+        names (iterable): Company names.
+        cache_path (str, optional): Lookup cache; None to fetch everything.
+        **lookup_options: Further arguments of ``lookup_records``.
+
+    Returns:
+        dict: Name -> (status, address or the failure message).
+    """
+    addresses = {}
+    records = lookup_records(names, cache_path=cache_path, **lookup_options)
+    for name, (status, record) in records.items():
+        if record is None or (isinstance(record, GSTRecord) and not record.address):
+            record = "Address not found."
+        elif isinstance(record, GSTRecord):
+            record = record.address
+        addresses[name] = (status, record)
+    return addresses
+
+
+def parse_args(argv=None):
+    """
+    Parse the command line.
+
+    Args:
+        argv (list, optional): Arguments; defaults to ``sys.argv[1:]``.
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(
+        description="Look up the GST registrations of a vendor master's names."
+    )
+    parser.add_argument("excel", help="workbook with the company names")
+    parser.add_argument("--column", default="NAME", help="column of the names")
+    parser.add_argument(
+        "--output", default="gst_addresses.xlsx", help="workbook for the registrations"
+    )
+    parser.add_argument("--cache", default=GST_CACHE_DB, help="lookup cache database")
+    parser.add_argument(
+        "--ttl-days",
+        type=float,
+        default=CACHE_TTL / 86400,
+        help="days a lookup stays fresh",
+    )
+    parser.add_argument("--base-url", default=BASE_URL, help="site to query")
+    parser.add_argument("--workers", type=int, default=8, help="lookups in flight")
+    parser.add_argument("--rate", type=float, default=4.0, help="requests per second")
+    parser.add_argument("--timeout", type=float, default=30, help="seconds per request")
+    parser.add_argument(
+        "--parse-workers", type=int, default=None, help="parsing processes"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Look up every name of the workbook and write their registrations.
+
+    Args:
+        argv (list, optional): Command line arguments.
+    """
+    args = parse_args(argv)
+    names = pd.read_excel(args.excel, usecols=[args.column])[args.column]
+    names = names.dropna().astype(str).str.strip().str.lower()
+    records = lookup_records(
+        names,
+        cache_path=args.cache,
+        parse_workers=args.parse_workers,
+        ttl=args.ttl_days * 86400,
+        base_url=args.base_url,
+        workers=args.workers,
+        rate=args.rate,
+        timeout=args.timeout,
+    )
+    rows = []
+    for name, (status, record) in records.items():
+        if not isinstance(record, GSTRecord):
+            record = GSTRecord(address=record or "Address not found.")
+        rows.append((name, status, *record))
+    table = pd.DataFrame(
+        rows,
+        columns=[
+            args.column, "Status", "GSTIN", "Business Name", "Address", "GST Status"
+        ],
+    )
+    table.to_excel(args.output, index=False)
+    print(table["Status"].fillna("error").astype(str).value_counts().to_string())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,1130 @@
+"""
+Streamlit-free core of the Non-PO payment analysis.
+
+Loading and normalising the extracts, the aggregation cube, the exception
+rules, the attendance matching and the Excel export live here so they can
+run headless, e.g. from ``non_po_batch.py``. ``analyze_excel.py`` adds the
+Streamlit caching, widgets and charts on top.
+
+Modules:
+    hashlib: Computes content hashes used as cache keys for uploaded files.
+    importlib.util: Detects the optional Parquet engines.
+    sqlite3: Persists the parsed attendance absences between sessions.
+    xlsxwriter: Writes the Excel exports row by row in constant memory.
+    numpy: Combines filter selections and rule masks over integer codes.
+    pandas: Reads and manipulates the Excel data.
+"""
+import hashlib
+import importlib.util
+import sqlite3
+from contextlib import closing
+from io import BytesIO
+import numpy as np
+import pandas as pd
+import xlsxwriter
+
+
+# Calendar-date and clock-time columns of the Non-PO extract. Dates are kept
+# as normalised datetime64 and times as timedelta64 (time since midnight) so
+# every tab shares one typed frame; conversion to Python objects happens only
+# in ``to_display`` right before rendering or exporting.
+DATE_COLUMNS = [
+    "Doc. Date",
+    "Pstng Date",
+    "On",
+    "Updated on",
+    "Verified on",
+    "HOD Apr/Rej on",
+    "HOG Approval on",
+    "Clearing date",
+]
+TIME_COLUMNS = ["Time", "Updated at", "Verified at", "HOG Approval at"]
+
+
+def parse_dates(series):
+    """
+    Parse a column of dates into normalised datetime64 values.
+
+    Args:
+        series (pd.Series): Raw column read from the Excel extract.
+
+    Returns:
+        pd.Series: datetime64 column with the time of day dropped;
+        unparseable values become NaT.
+    """
+    return pd.to_datetime(series, errors="coerce").dt.normalize()
+
+
+def parse_times(series):
+    """
+    Parse a column of clock times into timedelta64 values.
+
+    Args:
+        series (pd.Series): Raw column holding "%H:%M:%S" values.
+
+    Returns:
+        pd.Series: timedelta64 column (time since midnight); unparseable
+        values become NaT.
+    """
+    times = pd.to_datetime(
+        series.astype(str), format="%H:%M:%S", errors="coerce"
+    )
+    return times - times.dt.normalize()
+
+
+# ID columns of the Non-PO extract. Person IDs share one categorical dtype
+# so that authorization checks can compare them column against column;
+# the other IDs and the name columns get their own categorical dtype.
+PERSON_ID_COLUMNS = [
+    "Vendor",
+    "Created",
+    "Verified by",
+    "HOG Approval by",
+    "HOD Apr/Rej by",
+]
+CODE_COLUMNS = ["Cost Ctr", "G/L", "Document No"]
+CATEGORY_COLUMNS = [
+    "Vendor Name",
+    "CostctrName",
+    "G/L Name",
+    "category",
+    "Type",
+    "Status",
+]
+
+# Name column used to build the "id - name" display label of each ID column.
+# Creators are looked up in the vendor master, like the original dashboard.
+LABEL_NAME_COLUMNS = {
+    "Vendor": "Vendor Name",
+    "Cost Ctr": "CostctrName",
+    "G/L": "G/L Name",
+    "Created": "Vendor Name",
+}
+
+# Dimensions of the aggregation cube, see ``build_cube``.
+CUBE_DIMENSIONS = ["year", "category", "Cost Ctr", "G/L", "Vendor", "Created"]
+
+
+def normalise_ids(series):
+    """
+    Render an ID column as text without the ".0" Excel adds to numbers.
+
+    Args:
+        series (pd.Series): Raw ID column (numbers, text or a mix).
+
+    Returns:
+        pd.Series: object column of ID strings; missing IDs stay missing.
+    """
+    ids = series.astype("string").str.replace(r"\..*", "", regex=True)
+    return ids.astype(object).where(ids.notna())
+
+
+def apply_schema(df):
+    """
+    Cast the Non-PO frame to its compact canonical dtypes.
+
+    ID and name columns become categoricals, the person ID columns sharing
+    a single dtype, and "Amount" is numeric. The
+    function is idempotent, so it can be re-applied after concatenating
+    frames whose categories differ.
+
+    Args:
+        df (pd.DataFrame): Frame returned by ``pd.read_excel`` with the date
+        columns already parsed.
+
+    Returns:
+        pd.DataFrame: The same frame with the canonical dtypes applied.
+    """
+    person_ids = {col: normalise_ids(df[col]) for col in PERSON_ID_COLUMNS}
+    people = pd.unique(pd.concat(person_ids.values()).dropna())
+    person_dtype = pd.CategoricalDtype(sorted(people))
+    for col, ids in person_ids.items():
+        df[col] = ids.astype(person_dtype)
+    for col in CODE_COLUMNS:
+        df[col] = normalise_ids(df[col]).astype("category")
+    for col in CATEGORY_COLUMNS:
+        df[col] = df[col].astype(str).where(df[col].notna()).astype("category")
+    df["Amount"] = pd.to_numeric(df["Amount"], errors="coerce")
+    return df
+
+
+def build_name_table(df):
+    """
+    Look up the name of every ID of the ID columns.
+
+    Args:
+        df (pd.DataFrame): Frame with the canonical dtypes applied.
+
+    Returns:
+        dict: Maps each column of ``LABEL_NAME_COLUMNS`` to a Series indexed
+        by ID whose values are the names; IDs without a name map to NaN.
+    """
+    tables = {}
+    for id_col, name_col in LABEL_NAME_COLUMNS.items():
+        source = "Vendor" if name_col == "Vendor Name" else id_col
+        pairs = (
+            df[[source, name_col]]
+            .dropna(subset=[source])
+            .drop_duplicates(subset=[source], keep="last")
+            .astype(object)
+        )
+        names = pairs.set_index(source)[name_col]
+        ids = pd.Index(df[id_col].dropna().unique(), dtype=object)
+        tables[id_col] = names.reindex(ids)
+    return tables
+
+
+def build_label_table(df, names=None):
+    """
+    Build the "id - name" display labels of the ID columns.
+
+    Labels are computed once per distinct ID rather than per row.
+
+    Args:
+        df (pd.DataFrame): Frame with the canonical dtypes applied.
+        names (dict, optional): Name tables from ``build_name_table``.
+        Built from ``df`` when omitted.
+
+    Returns:
+        dict: Maps each column of ``LABEL_NAME_COLUMNS`` to a Series indexed
+        by ID whose values are the display labels.
+    """
+    if names is None:
+        names = build_name_table(df)
+    tables = {}
+    for id_col, id_names in names.items():
+        ids = id_names.index
+        labels = pd.Series(ids, index=ids)
+        named = id_names.notna()
+        labels[named] = labels[named] + " - " + id_names[named]
+        tables[id_col] = labels
+    return tables
+
+
+def id_labels(series, labels):
+    """
+    Map an ID column to its display labels.
+
+    Args:
+        series (pd.Series): ID column.
+        labels (pd.Series): Label table from ``build_label_table``.
+
+    Returns:
+        pd.Series: "id - name" labels aligned with ``series``. Categorical
+        columns are relabelled through their categories only, so the cost
+        does not grow with the number of rows.
+    """
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = series.cat.categories.astype(object)
+        renamed = labels.reindex(categories)
+        renamed = renamed.where(renamed.notna(), categories.to_series(index=categories))
+        return series.cat.rename_categories(renamed.to_numpy())
+    return series.map(labels)
+
+
+def with_id_labels(df, labels):
+    """
+    Return a view of ``df`` whose ID columns hold their display labels.
+
+    The labels are rendered as text so they can be sorted and offered as
+    widget options. ``df`` itself keeps its raw IDs, and rows selected on
+    the labelled view map back to it through the shared index.
+
+    Args:
+        df (pd.DataFrame): Frame with the canonical dtypes applied.
+        labels (dict): Label tables from ``build_label_table``.
+
+    Returns:
+        pd.DataFrame: Shallow copy of ``df`` with labelled ID columns.
+    """
+    view = df.copy(deep=False)
+    for col, col_labels in labels.items():
+        view[col] = id_labels(view[col], col_labels).astype(str)
+    return view
+
+
+def build_filter_index(df, columns, labels):
+    """
+    Precompute the integer codes behind a cascade of filter widgets.
+
+    Args:
+        df (pd.DataFrame): Frame with the canonical dtypes applied.
+        columns (list): Columns the widgets filter on.
+        labels (dict): Label tables from ``build_label_table``; labelled
+        columns offer "id - name" options.
+
+    Returns:
+        dict: Maps each column to a ``(codes, options)`` pair, where
+        ``codes`` is the column's category code per row (-1 when missing)
+        and ``options`` the matching option labels.
+    """
+    index = {}
+    for col in columns:
+        values = df[col]
+        if not isinstance(values.dtype, pd.CategoricalDtype):
+            values = values.astype("category")
+        if col in labels:
+            values = id_labels(values, labels[col])
+        options = values.cat.categories.astype(str)
+        index[col] = (values.cat.codes.to_numpy(), options)
+    return index
+
+
+def filter_options(column_index, mask=None):
+    """
+    List the options still present among the selected rows.
+
+    Args:
+        column_index (tuple): ``(codes, options)`` from
+        ``build_filter_index``.
+        mask (np.ndarray, optional): Rows selected by the earlier widgets.
+        Defaults to all rows.
+
+    Returns:
+        list: Option labels in category order.
+    """
+    codes, options = column_index
+    if mask is not None:
+        codes = codes[mask]
+    present = np.bincount(codes[codes >= 0], minlength=len(options)) > 0
+    return options[present].tolist()
+
+
+def filter_mask(column_index, selected, mask=None):
+    """
+    Narrow a row selection to the rows matching the chosen options.
+
+    Args:
+        column_index (tuple): ``(codes, options)`` from
+        ``build_filter_index``.
+        selected (list): Chosen option labels.
+        mask (np.ndarray, optional): Rows selected by the earlier widgets.
+        Defaults to all rows.
+
+    Returns:
+        np.ndarray: Boolean mask of the rows kept.
+    """
+    codes, options = column_index
+    selected_codes = options.get_indexer(selected)
+    keep = np.isin(codes, selected_codes[selected_codes >= 0])
+    return keep if mask is None else mask & keep
+
+
+def tab_view(base, columns=None, rename=None):
+    """
+    Project the shared base frame for one tab.
+
+    The result is a new frame, so a tab can rename, add or replace whole
+    columns without touching the cached base. Under pandas' copy-on-write
+    mode, which the dashboard turns on, it also shares memory with
+    ``base`` until written to; without it the column selection copies.
+
+    Args:
+        base (pd.DataFrame): Shared frame returned by ``read_extract``.
+        columns (list, optional): Columns the tab uses, named after
+        ``rename`` is applied. Defaults to all columns.
+        rename (dict, optional): Column renames for the tab.
+
+    Returns:
+        pd.DataFrame: Lazy projection of ``base``.
+    """
+    view = base.copy(deep=False)
+    if rename:
+        view.columns = view.columns.map(lambda col: rename.get(col, col))
+    if columns is not None:
+        view = view[columns]
+    return view
+
+
+def to_display(df):
+    """
+    Render typed date/time columns as Python date/time objects.
+
+    Only meant for the final frame displayed or written
+    to Excel; all filtering and grouping should stay on the typed columns.
+
+    Args:
+        df (pd.DataFrame): Frame holding datetime64/timedelta64 columns.
+
+    Returns:
+        pd.DataFrame: Shallow copy of ``df`` with datetime64 columns converted
+        to ``datetime.date`` and timedelta64 columns to ``datetime.time``.
+    """
+    df = df.copy(deep=False)
+    for col in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[col]):
+            df[col] = df[col].dt.date
+        elif pd.api.types.is_timedelta64_dtype(df[col]):
+            df[col] = (pd.Timestamp(0) + df[col]).dt.time
+    return df
+
+
+XLSX_MIME = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+# Parquet export is offered only when pandas has an engine for it
+PARQUET_AVAILABLE = any(
+    importlib.util.find_spec(engine) for engine in ("pyarrow", "fastparquet")
+)
+
+
+def write_workbook(sheets):
+    """
+    Write frames to an Excel workbook in xlsxwriter's constant_memory mode.
+
+    Rows are written strictly in order, so xlsxwriter flushes each one to
+    disk instead of holding the whole sheet in memory.
+
+    Args:
+        sheets (dict): Maps sheet names to the frames to write.
+
+    Returns:
+        bytes: The .xlsx file contents.
+    """
+    buffer = BytesIO()
+    workbook = xlsxwriter.Workbook(
+        buffer,
+        {
+            "constant_memory": True,
+            "default_date_format": "yyyy-mm-dd",
+            "strings_to_urls": False,
+        },
+    )
+    header_format = workbook.add_format({"bold": True, "border": 1})
+    for sheet_name, df in sheets.items():
+        worksheet = workbook.add_worksheet(sheet_name)
+        worksheet.write_row(0, 0, [str(col) for col in df.columns], header_format)
+        df = to_display(df).astype(object)
+        df = df.where(df.notna(), None)
+        for row_number, row in enumerate(df.itertuples(index=False), start=1):
+            worksheet.write_row(row_number, 0, row)
+    workbook.close()
+    return buffer.getvalue()
+
+
+def write_parquet(df):
+    """
+    Write a frame to Parquet.
+
+    Object columns mix numbers and text in the Non-PO extract, so they are
+    written as strings.
+
+    Args:
+        df (pd.DataFrame): Frame to write.
+
+    Returns:
+        bytes: The .parquet file contents.
+    """
+    text_columns = df.select_dtypes(include="object").columns
+    df = df.astype({col: "string" for col in text_columns})
+    buffer = BytesIO()
+    df.to_parquet(buffer, index=False)
+    return buffer.getvalue()
+
+
+def read_extract(file):
+    """
+    Read one Non-PO payment extract into the canonical frame.
+
+    Args:
+    - file: Path or file object of the extract (xlsx format).
+
+    Returns:
+    - pandas.DataFrame: The processed non-PO payment data.
+
+    Date columns (``DATE_COLUMNS``) are returned as datetime64 and time
+    columns (``TIME_COLUMNS``) as timedelta64; use ``to_display`` to turn
+    them into Python objects for rendering. IDs and names are categoricals,
+    see ``apply_schema``.
+
+    """
+    df = pd.read_excel(file)
+    for col in DATE_COLUMNS:
+        df[col] = parse_dates(df[col])
+    for col in TIME_COLUMNS:
+        df[col] = parse_times(df[col])
+    df["year"] = df["Pstng Date"].dt.year
+    df.drop(columns=["Year"], inplace=True)
+    df.reset_index(drop=True, inplace=True)
+    return apply_schema(df)
+
+
+def build_cube(df):
+    """
+    Aggregate the Non-PO frame over ``CUBE_DIMENSIONS``.
+
+    Every card, trend line and top-N table of the dashboard is a roll-up of
+    this cube, so they are answered from a few thousand rows instead of the
+    full transaction frame.
+
+    Args:
+        df (pd.DataFrame): Frame with the canonical dtypes applied.
+
+    Returns:
+        pd.DataFrame: One row per observed combination of the dimensions,
+        with the summed "Amount" and the number of "Transactions". Missing
+        dimension values form their own groups.
+    """
+    return (
+        df.groupby(CUBE_DIMENSIONS, observed=True, dropna=False, sort=False)
+        .agg(Amount=("Amount", "sum"), Transactions=("Amount", "size"))
+        .reset_index()
+    )
+
+
+def data_fingerprint(files):
+    """
+    Identify the loaded dataset without hashing its contents.
+
+    Args:
+        files (list): Uploaded files (or paths) the dataset was built from.
+
+    Returns:
+        tuple: The upload ids of the files, or the paths themselves.
+    """
+    return tuple(getattr(file, "file_id", file) for file in files)
+
+
+def combine_cubes(cubes):
+    """
+    Merge per-file cubes into the cube of all the files.
+
+    Args:
+        cubes (list of pd.DataFrame): Cubes returned by ``file_cube``.
+
+    Returns:
+        pd.DataFrame: Cube of the concatenated files, equal to
+        ``build_cube`` of their concatenated frames.
+    """
+    if len(cubes) == 1:
+        return cubes[0]
+    cube = (
+        pd.concat(cubes, ignore_index=True)
+        .groupby(CUBE_DIMENSIONS, observed=True, dropna=False, sort=False)[
+            ["Amount", "Transactions"]
+        ]
+        .sum()
+        .reset_index()
+    )
+    for col in CUBE_DIMENSIONS[1:]:
+        cube[col] = cube[col].astype("category")
+    return cube
+
+
+def group_totals(cube, by, names=None):
+    """
+    Total the aggregation cube per group.
+
+    A single groupby over the cube replaces broadcasting group sums back to
+    every transaction and de-duplicating the sorted frame.
+
+    Args:
+        cube (pd.DataFrame): Cube (or a slice of it) from ``build_cube``.
+        by (str): Dimension to group on.
+        names (pd.Series, optional): Names indexed by ID, from
+        ``build_name_table``; adds a "Name" column.
+
+    Returns:
+        pd.DataFrame: One row per group with its "Amount" and
+        "Transactions" and their shares of the cube totals, "Amount %" and
+        "Transactions %", sorted by "Amount" descending.
+    """
+    measures = ["Amount", "Transactions"]
+    totals = cube.groupby(by, observed=True)[measures].sum()
+    table = totals.index.to_frame(index=False)
+    if names is not None:
+        table["Name"] = names.reindex(totals.index.astype(object)).to_numpy()
+    for col in measures:
+        table[col] = totals[col].to_numpy()
+        table[f"{col} %"] = table[col] / cube[col].sum() * 100
+    return table.sort_values("Amount", ascending=False, ignore_index=True)
+
+
+def top_n(table, column, n=25, columns=None):
+    """
+    Rank the ``n`` largest rows of a group table.
+
+    Args:
+        table (pd.DataFrame): Table from ``group_totals``.
+        column (str): Column to rank on.
+        n (int, optional): Number of rows to keep. Defaults to 25.
+        columns (list, optional): Columns to return. Defaults to all.
+
+    Returns:
+        pd.DataFrame: The top rows numbered from 1 under an "S.NO" axis.
+    """
+    ranked = table.nlargest(n, column)
+    if columns is not None:
+        ranked = ranked[columns]
+    ranked.index = range(1, len(ranked) + 1)
+    return ranked.rename_axis("S.NO", axis=1)
+
+
+def load_holiday_calendar(path):
+    """
+    Read the holiday calendar workbook.
+
+    Args:
+        path (str): Workbook with a "date" column.
+
+    Returns:
+        np.ndarray: Sorted, unique and read-only datetime64 holiday dates.
+    """
+    dates = pd.to_datetime(
+        pd.read_excel(path, usecols=["date"])["date"],
+        format="%Y/%m/%d",
+        errors="coerce",
+    )
+    calendar = np.unique(dates.dropna().dt.normalize().to_numpy())
+    calendar.flags.writeable = False
+    return calendar
+
+
+def is_holiday(dates, calendar, weekends=False, second_saturdays=False):
+    """
+    Flag the dates that fall on a holiday.
+
+    Args:
+        dates (pd.Series): datetime64 dates.
+        calendar (np.ndarray): Holiday dates from ``load_holiday_calendar``.
+        weekends (bool, optional): Also flag Saturdays and Sundays.
+        Defaults to False.
+        second_saturdays (bool, optional): Also flag the second Saturday of
+        every month. Defaults to False.
+
+    Returns:
+        np.ndarray: Boolean mask aligned with ``dates``; missing dates are
+        never holidays.
+    """
+    values = dates.to_numpy(dtype=calendar.dtype)
+    positions = np.searchsorted(calendar, values)
+    inside = positions < len(calendar)
+    holiday = np.zeros(len(values), dtype=bool)
+    holiday[inside] = calendar[positions[inside]] == values[inside]
+    if weekends or second_saturdays:
+        weekday = dates.dt.dayofweek.to_numpy()
+        if weekends:
+            holiday |= weekday >= 5
+        if second_saturdays:
+            holiday |= (weekday == 5) & dates.dt.day.between(8, 14).to_numpy()
+    return holiday
+
+
+# Exception rules. Each rule is evaluated once per dataset into a row mask or
+# per-row group ids, kept in a memo dict, and a combination of General,
+# Authorization and Special parameters is answered by combining them.
+SPECIAL_PARAMETER_COLUMNS = {
+    "Holiday Transactions": "Posting Date",
+    "Inv-Special Character": "Invoice Number",
+    "80 % Same Invoice": "Invoice Number",
+}
+EXCEPTION_SORT_COLUMNS = ["Reimbursement ID", "Cost Center"]
+
+# Column names of the frame the exception rules run on (the Exceptions tab
+# and the batch audit), and the columns it keeps.
+EXCEPTION_RENAME = {
+    "Vendor Name": "Name",
+    "Pstng Date": "Posting Date",
+    "Type": "Doc.Type",
+    "Vendor": "Reimbursement ID",
+    "Cost Ctr": "Cost Center",
+    "Doc. Date": "Document Date",
+    "category": "Category",
+    "year": "YEAR",
+    "Verified by": "Verifier ID",
+    "Created": "Creator ID",
+    "HOG Approval by": "HOG(Approval) ID",
+    "HOD Apr/Rej by": "HOD(Approval) ID",
+}
+EXCEPTION_COLUMNS = [
+    "Payable req.no",
+    "Doc.Type",
+    "Reimbursement ID",
+    "Amount",
+    "Document Date",
+    "Name",
+    "YEAR",
+    "Invoice Number",
+    "Text",
+    "Cost Center",
+    "G/L",
+    "Document No",
+    "Posting Date",
+    "Creator ID",
+    "Verifier ID",
+    "HOD(Approval) ID",
+    "Category",
+    "Reference invoice",
+    "CostctrName",
+    "G/L Name",
+    "Profit Ctr",
+    "GR/IC Reference",
+    "Org.unit",
+    "Status",
+    "File 1",
+    "File 2",
+    "File 3",
+    "Time",
+    "Updated at",
+    "Reason for Rejection",
+    "Verified at",
+    "Reference document",
+    "Adv.doc year",
+    "HOG(Approval) ID",
+    "Request no (Advance mulitple selection)",
+    "Invoice Reference Number",
+    "HOG Approval at",
+    "HOG Approval Req",
+    "Requested HOG ID",
+    "Month",
+    "Vesselcode",
+    "PEA Number",
+    "Status of Request",
+    "Clearing doc no.",
+    "On",
+    "Updated on",
+    "Verified on",
+    "HOG Approval on",
+    "Clearing date",
+]
+
+
+def memoised(memo, key, compute):
+    """
+    Return ``memo[key]``, computing and storing it on first use.
+
+    Args:
+        memo (dict): Rule results of the dataset, see ``memoised``.
+        key (tuple): Rule name and its arguments.
+        compute (callable): Evaluates the rule.
+
+    Returns:
+        The stored rule result.
+    """
+    if key not in memo:
+        memo[key] = compute()
+    return memo[key]
+
+
+def equal_ids_mask(df, columns, memo):
+    """
+    Flag the rows whose checked ID columns all hold the same ID.
+
+    Args:
+        df (pd.DataFrame): Frame from ``exception_view``.
+        columns (list): Authorization columns to compare, in order.
+        memo (dict): Rule results of the dataset, see ``memoised``.
+
+    Returns:
+        np.ndarray: Boolean row mask.
+
+    Raises:
+        ValueError: If a single column is checked.
+    """
+    if len(columns) == 1:
+        raise ValueError(
+            "Please select another checkbox to verify Authorization Parameters."
+        )
+
+    def compute():
+        mask = np.ones(len(df), dtype=bool)
+        for col_i, col_j in zip(columns, columns[1:]):
+            mask &= df[col_i].astype(object).to_numpy() == df[col_j].astype(
+                object
+            ).to_numpy()
+        return mask
+
+    return memoised(memo, ("equal_ids", tuple(columns)), compute)
+
+
+def holiday_mask(df, holidays, memo):
+    """
+    Flag the rows posted on a holiday.
+
+    Args:
+        df (pd.DataFrame): Frame from ``exception_view``.
+        holidays (np.ndarray): Calendar from ``load_holiday_calendar``.
+        memo (dict): Rule results of the dataset, see ``memoised``.
+
+    Returns:
+        np.ndarray: Boolean row mask.
+    """
+    return memoised(
+        memo, ("holiday",), lambda: is_holiday(df["Posting Date"], holidays)
+    )
+
+
+def group_ids(df, columns, memo):
+    """
+    Number the groups of rows sharing the values of ``columns``.
+
+    Invoice numbers are compared as text, so ``123`` and ``"123"`` are the
+    same invoice.
+
+    Args:
+        df (pd.DataFrame): Frame from ``exception_view``.
+        columns (list): Columns defining a group; missing values match.
+        memo (dict): Rule results of the dataset, see ``memoised``.
+
+    Returns:
+        np.ndarray: Group id of every row.
+    """
+
+    def compute():
+        keys = [
+            df[col].astype(str) if col == "Invoice Number" else df[col]
+            for col in columns
+        ]
+        return (
+            df.groupby(keys, observed=True, dropna=False, sort=False)
+            .ngroup()
+            .to_numpy()
+        )
+
+    return memoised(memo, ("groups", tuple(columns)), compute)
+
+
+def invoice_ids(df, memo):
+    """
+    Number the invoices, raw and with special characters removed.
+
+    Args:
+        df (pd.DataFrame): Frame from ``exception_view``.
+        memo (dict): Rule results of the dataset, see ``memoised``.
+
+    Returns:
+        tuple: Per-row ids of the invoice number and of the cleaned
+        invoice number.
+    """
+
+    def compute():
+        invoices = df["Invoice Number"].astype(str)
+        cleaned = invoices.str.replace(r"[^A-Za-z0-9]+", "", regex=True)
+        return pd.factorize(invoices)[0], pd.factorize(cleaned)[0]
+
+    return memoised(memo, ("invoices",), compute)
+
+
+def repeated_within(groups, mask):
+    """
+    Keep the selected rows whose group occurs more than once among them.
+
+    Args:
+        groups (np.ndarray): Non-negative group id of every row.
+        mask (np.ndarray): Selected rows.
+
+    Returns:
+        np.ndarray: Boolean row mask.
+    """
+    counts = np.bincount(groups[mask], minlength=len(groups))
+    return mask & (counts[groups] > 1)
+
+
+def special_character_invoices(df, memo, mask):
+    """
+    Keep one row per invoice among invoices that differ only by special
+    characters.
+
+    Args:
+        df (pd.DataFrame): Frame from ``exception_view``.
+        memo (dict): Rule results of the dataset, see ``memoised``.
+        mask (np.ndarray): Selected rows.
+
+    Returns:
+        np.ndarray: Boolean mask of the latest posted row of each such
+        invoice.
+    """
+    invoices, cleaned = invoice_ids(df, memo)
+    positions = np.flatnonzero(mask)
+    latest = (
+        pd.DataFrame(
+            {
+                "invoice": invoices[positions],
+                "date": df["Posting Date"].to_numpy()[positions],
+            },
+            index=positions,
+        )
+        .sort_values(["invoice", "date"])
+        .drop_duplicates(subset="invoice", keep="last")
+        .index
+    )
+    kept = np.zeros(len(df), dtype=bool)
+    kept[latest] = True
+    return repeated_within(cleaned, kept)
+
+
+def exception_mask(df, memo, general, authorization, special, holidays, mask):
+    """
+    Select the exception rows of a General/Authorization/Special
+    checkbox combination.
+
+    Authorization rules apply first, then the Special rules (holiday,
+    special characters, same invoice) and the General duplicate check, each
+    on the rows left by the previous one.
+
+    Args:
+        df (pd.DataFrame): Frame from ``exception_view``.
+        memo (dict): Rule results of the dataset, see ``memoised``.
+        general (list): Checked General columns.
+        authorization (list): Checked Authorization columns.
+        special (list): Checked Special parameters.
+        holidays (np.ndarray): Calendar from ``load_holiday_calendar``.
+        mask (np.ndarray): Rows selected by the year and category filters.
+
+    Returns:
+        tuple: Boolean row mask and the columns to sort the result by.
+
+    Raises:
+        ValueError: If nothing is checked or a single Authorization
+        column is.
+    """
+    if not general and not authorization and not special:
+        raise ValueError("Please select at least one Checkbox .")
+    sort_columns = []
+    if authorization:
+        mask = mask & equal_ids_mask(df, authorization, memo)
+        sort_columns = list(authorization)
+    if special:
+        if "Holiday Transactions" in special:
+            mask = mask & holiday_mask(df, holidays, memo)
+        if "Inv-Special Character" in special:
+            mask = special_character_invoices(df, memo, mask)
+        if "80 % Same Invoice" in special:
+            mask = repeated_within(invoice_ids(df, memo)[1], mask)
+        sort_columns = [SPECIAL_PARAMETER_COLUMNS[col] for col in special]
+    if general:
+        mask = repeated_within(group_ids(df, general, memo), mask)
+        sort_columns = list(general)
+    sort_columns += [col for col in EXCEPTION_SORT_COLUMNS if col not in sort_columns]
+    return mask, list(dict.fromkeys(sort_columns))
+
+
+def exception_view(df):
+    """
+    Project the canonical frame onto the columns of the exception rules.
+
+    Args:
+        df (pd.DataFrame): Frame with the canonical dtypes applied.
+
+    Returns:
+        pd.DataFrame: Lazy projection with ``EXCEPTION_RENAME`` applied.
+    """
+    return tab_view(df, columns=EXCEPTION_COLUMNS, rename=EXCEPTION_RENAME)
+
+
+def exception_rows(df, mask, sort_columns):
+    """
+    Materialise the exception rows selected by ``exception_mask``.
+
+    Args:
+        df (pd.DataFrame): Frame from ``exception_view``.
+        mask (np.ndarray): Row mask from ``exception_mask``.
+        sort_columns (list): Sort columns from ``exception_mask``.
+
+    Returns:
+        pd.DataFrame: The selected rows, sorted and numbered from 1.
+    """
+    text_columns = ["Name", "Invoice Number", "Reimbursement ID"]
+    rows = df[mask].astype(dict.fromkeys(text_columns, str))
+    rows = rows.sort_values(by=sort_columns)
+    rows.reset_index(drop=True, inplace=True)
+    rows.index += 1
+    return rows
+
+
+# Absence rows of the uploaded attendance workbooks, stored once per file
+# content (SHA-256 of the workbook) so that re-analysing the same files
+# does not parse them again, across sessions as well.
+ATTENDANCE_DB = "attendance_cache.db"
+ATTENDANCE_COLUMNS = ["Personnel No.", "Date", "Empl./appl.name", "Name"]
+
+
+def connect_attendance_db(db_path=ATTENDANCE_DB):
+    """
+    Open the attendance cache, creating its tables on first use.
+
+    Args:
+        db_path (str): Path of the SQLite database file.
+
+    Returns:
+        sqlite3.Connection: Open connection to the cache.
+    """
+    conn = sqlite3.connect(db_path)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS attendance_files "
+        "(digest TEXT PRIMARY KEY, file_name TEXT)"
+    )
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS absences (digest TEXT, "
+        '"Personnel No." TEXT, "Date" TEXT, "Empl./appl.name" TEXT, "Name" TEXT)'
+    )
+    conn.execute(
+        "CREATE INDEX IF NOT EXISTS absences_person_date "
+        'ON absences ("Personnel No.", "Date")'
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS absences_digest ON absences (digest)")
+    return conn
+
+
+def read_absences(file):
+    """
+    Parse one attendance workbook and keep only its absence rows.
+
+    A day counts as an absence when both "IN Time" and "OUT Time" are
+    "00:00:00".
+
+    Args:
+        file: Path or file object of the attendance workbook.
+
+    Returns:
+        pd.DataFrame: ``ATTENDANCE_COLUMNS`` of the absence rows, with
+        normalised personnel numbers and a datetime64 "Date" column.
+    """
+    df = pd.read_excel(
+        file, usecols=lambda col: col in ATTENDANCE_COLUMNS + ["IN Time", "OUT Time"]
+    )
+    df = df[(df["IN Time"] == "00:00:00") & (df["OUT Time"] == "00:00:00")]
+    df = df[ATTENDANCE_COLUMNS]
+    df["Personnel No."] = normalise_ids(df["Personnel No."])
+    df["Date"] = parse_dates(df["Date"])
+    return df
+
+
+def load_absences(files, db_path=ATTENDANCE_DB):
+    """
+    Absence rows of the given attendance workbooks.
+
+    Each workbook is parsed only the first time its content is seen; after
+    that its rows are read back from the cache.
+
+    Args:
+        files (list): Uploaded attendance workbooks (file objects).
+        db_path (str): Path of the SQLite cache.
+
+    Returns:
+        pd.DataFrame: Absence rows of all files, sorted by employee name
+        and date and indexed from 1.
+    """
+    digests = []
+    with closing(connect_attendance_db(db_path)) as conn:
+        for file in files:
+            digest = hashlib.sha256(file.getvalue()).hexdigest()
+            digests.append(digest)
+            cached = conn.execute(
+                "SELECT 1 FROM attendance_files WHERE digest = ?", (digest,)
+            ).fetchone()
+            if cached:
+                continue
+            absences = read_absences(file)
+            absences = absences.assign(
+                digest=digest, Date=absences["Date"].dt.strftime("%Y-%m-%d")
+            )
+            # Drop rows left behind by an interrupted earlier ingest
+            conn.execute("DELETE FROM absences WHERE digest = ?", (digest,))
+            absences.to_sql("absences", conn, if_exists="append", index=False)
+            conn.execute(
+                "INSERT INTO attendance_files VALUES (?, ?)",
+                (digest, getattr(file, "name", "")),
+            )
+            conn.commit()
+        columns = ", ".join(f'"{col}"' for col in ATTENDANCE_COLUMNS)
+        placeholders = ", ".join("?" * len(digests))
+        df = pd.read_sql_query(
+            f"SELECT {columns} FROM absences WHERE digest IN ({placeholders})",
+            conn,
+            params=digests,
+        )
+    df["Date"] = parse_dates(df["Date"])
+    df = df.sort_values(by=["Empl./appl.name", "Date"], ignore_index=True)
+    df.index += 1  # Start index from 1
+    return df
+
+
+def absent_people(attendance):
+    """
+    Name and department of every employee in the attendance extract.
+
+    Args:
+        attendance (pd.DataFrame): Absence rows with a normalised
+        "Personnel No." column.
+
+    Returns:
+        pd.DataFrame: "NAME" and "Department" columns indexed by personnel
+        number, taken from the last row of each employee.
+    """
+    people = attendance.drop_duplicates(subset="Personnel No.", keep="last")
+    people = people.set_index("Personnel No.")[["Empl./appl.name", "Name"]]
+    return people.rename(columns={"Empl./appl.name": "NAME", "Name": "Department"})
+
+
+def approver_details(ids, people):
+    """
+    Look up the name and department of each approver ID.
+
+    Args:
+        ids (pd.Series): Approver ID column.
+        people (pd.DataFrame): Table from ``absent_people``.
+
+    Returns:
+        pd.DataFrame: "NAME" and "Department" aligned with ``ids``.
+    """
+    return people.reindex(ids.astype(object)).set_axis(ids.index)
+
+
+def summarise_approvers(matched, by_col, date_col, people, role):
+    """
+    Aggregate absent-day approvals per approver.
+
+    Args:
+        matched (pd.DataFrame): Rows from ``match_absent_approvals``.
+        by_col (str): Approver ID column.
+        date_col (str): Approval date column.
+        people (pd.DataFrame): Table from ``absent_people``.
+        role (str): "HOD" or "HOG", used to name the ID and name columns.
+
+    Returns:
+        pd.DataFrame: One row per approver with the approved "value", the
+        "Count of transactions" and the number of distinct days
+        ("No of Days"), sorted by value.
+    """
+    summary = matched.groupby(by_col, observed=True).agg(
+        **{
+            "value": ("Amount", "sum"),
+            "Count of transactions": (by_col, "size"),
+            "No of Days": (date_col, "nunique"),
+        }
+    )
+    details = people.reindex(summary.index.astype(object))
+    summary.insert(0, f"{role} NAME", details["NAME"].to_numpy())
+    summary.insert(1, "Department", details["Department"].to_numpy())
+    summary = summary.rename_axis(f"{role} ID").reset_index()
+    return summary.sort_values(by="value", ascending=False, ignore_index=True)
+
+
+def match_absent_approvals(approvals, attendance, date_col, by_col, people, role):
+    """
+    Find approvals given on a day the approver was marked absent.
+
+    The (approver, date) pairs of the attendance extract are joined to the
+    approvals with a typed inner merge; the approver IDs are cast to the
+    approvals' categorical dtype so the join runs on integer codes.
+
+    Args:
+        approvals (pd.DataFrame): Non-PO frame with the canonical dtypes.
+        attendance (pd.DataFrame): Absence rows with normalised
+        "Personnel No." and datetime64 "Date" columns.
+        date_col (str): Approval date column, e.g. "HOD Apr/Rej on".
+        by_col (str): Approver ID column, e.g. "HOD Apr/Rej by".
+        people (pd.DataFrame): Table from ``absent_people``.
+        role (str): "HOD" or "HOG".
+
+    Returns:
+        tuple: The matching approval rows, in their original order, and
+        their per-approver aggregates from ``summarise_approvers``.
+    """
+    absences = attendance[["Personnel No.", "Date"]].set_axis(
+        [by_col, date_col], axis=1
+    )
+    absences[by_col] = absences[by_col].astype(approvals[by_col].dtype)
+    absences = absences.dropna().drop_duplicates()
+    matched = approvals.merge(absences, on=[by_col, date_col], how="inner")
+    summary = summarise_approvers(matched, by_col, date_col, people, role)
+    return matched, summary
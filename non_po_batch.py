@@ -0,0 +1,163 @@
+"""
+Headless month-end audit of Non-PO payment extracts.
+
+Runs the exception rules of the dashboard's Exceptions tab over every
+extract (.xlsx) in a directory, one process per extract, and writes one
+exceptions workbook per extract.
+
+Example:
+    python non_po_batch.py extracts/ --output audit/ \\
+        --general "Invoice Number" Amount --special "Holiday Transactions"
+
+Modules:
+    argparse: Parses the command line.
+    os: Lists the extracts and builds the output paths.
+    concurrent.futures: Audits the extracts across processes.
+    numpy: Builds the empty holiday calendar and the initial row mask.
+    non_po_analysis: Loading, exception rules and the Excel export.
+"""
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+
+import numpy as np
+
+from non_po_analysis import (
+    SPECIAL_PARAMETER_COLUMNS,
+    exception_mask,
+    exception_rows,
+    exception_view,
+    load_holiday_calendar,
+    read_extract,
+    write_workbook,
+)
+
+# Checkbox names of the Exceptions tab, in the order the tab shows them.
+GENERAL_PARAMETERS = [
+    "Reimbursement ID",
+    "Amount",
+    "Document Date",
+    "Cost Center",
+    "G/L",
+    "Invoice Number",
+    "Text",
+]
+AUTHORIZATION_PARAMETERS = [
+    "Reimbursement ID",
+    "Creator ID",
+    "Verifier ID",
+    "HOG(Approval) ID",
+    "HOD(Approval) ID",
+]
+SPECIAL_PARAMETERS = list(SPECIAL_PARAMETER_COLUMNS)
+
+
+def audit_extract(path, output_dir, general, authorization, special, holidays):
+    """
+    Run the exception rules over one extract and write its workbook.
+
+    Args:
+        path (str): Non-PO extract to audit.
+        output_dir (str): Directory the workbook is written to.
+        general (list): General parameters to check.
+        authorization (list): Authorization parameters to check.
+        special (list): Special parameters to check.
+        holidays (np.ndarray): Calendar from ``load_holiday_calendar``.
+
+    Returns:
+        tuple: Path of the written workbook and its number of rows.
+    """
+    view = exception_view(read_extract(path))
+    mask, sort_columns = exception_mask(
+        view,
+        {},
+        general,
+        authorization,
+        special,
+        holidays,
+        np.ones(len(view), dtype=bool),
+    )
+    rows = exception_rows(view, mask, sort_columns)
+    stem = os.path.splitext(os.path.basename(path))[0]
+    output = os.path.join(output_dir, f"{stem} exceptions.xlsx")
+    with open(output, "wb") as file:
+        file.write(write_workbook({"Exceptions": rows}))
+    return output, len(rows)
+
+
+def parse_args(argv=None):
+    """
+    Parse the command line.
+
+    Args:
+        argv (list, optional): Arguments; defaults to ``sys.argv[1:]``.
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(
+        description="Write the exception workbooks of a directory of Non-PO extracts."
+    )
+    parser.add_argument("extracts", help="directory holding the .xlsx extracts")
+    parser.add_argument(
+        "--output", default="exceptions", help="directory for the workbooks"
+    )
+    parser.add_argument(
+        "--general", nargs="+", default=[], choices=GENERAL_PARAMETERS
+    )
+    parser.add_argument(
+        "--authorization", nargs="+", default=[], choices=AUTHORIZATION_PARAMETERS
+    )
+    parser.add_argument(
+        "--special", nargs="+", default=[], choices=SPECIAL_PARAMETERS
+    )
+    parser.add_argument(
+        "--holidays",
+        default="unlocked holiday.xlsx",
+        help="holiday calendar workbook with a 'date' column",
+    )
+    parser.add_argument(
+        "--workers", type=int, default=None, help="processes (default: all cores)"
+    )
+    args = parser.parse_args(argv)
+    if not args.general and not args.authorization and not args.special:
+        parser.error("select at least one General, Authorization or Special parameter")
+    if len(args.authorization) == 1:
+        parser.error("select another Authorization parameter to compare with")
+    return args
+
+
+def main(argv=None):
+    """
+    Audit every extract of a directory across processes.
+
+    Args:
+        argv (list, optional): Command line arguments.
+    """
+    args = parse_args(argv)
+    extracts = sorted(
+        os.path.join(args.extracts, name)
+        for name in os.listdir(args.extracts)
+        if name.endswith(".xlsx") and not name.startswith("~$")
+    )
+    if "Holiday Transactions" in args.special:
+        holidays = load_holiday_calendar(args.holidays)
+    else:
+        holidays = np.array([], dtype="datetime64[ns]")
+    os.makedirs(args.output, exist_ok=True)
+    audit = partial(
+        audit_extract,
+        output_dir=args.output,
+        general=args.general,
+        authorization=args.authorization,
+        special=args.special,
+        holidays=holidays,
+    )
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        for path, (output, count) in zip(extracts, pool.map(audit, extracts)):
+            print(f"{os.path.basename(path)}: {count} exception rows -> {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,196 @@
+"""
+Batch truck planning for the shipments in ``shipment_details.db``.
+
+Reads each shipment's cars from the ShipmentDetails table (loaded from
+Shipment.xlsx by Truckoptimization.ipynb), solves its truck loading with
+``cached_solve`` across a process pool and writes every car's truck
+and deck position to the TruckPlans table.
+
+Shipment lines carry a Model_Code while the loader knows model names, so
+the codes are looked up in a ModelCodes table (columns Model_Code and
+Model). ``--model-codes`` loads that table from a CSV or Excel file. Lines
+whose code has no known model are reported and left out of the plans.
+
+Example:
+    python truck_batch.py --date 2022-01-01 --model-codes model_codes.xlsx
+
+Modules:
+    argparse: Parses the command line.
+    sqlite3: Reads the shipments and stores the plans.
+    concurrent.futures: Plans the shipments across processes.
+    pandas: Reads the model code file.
+    truck_optimization: Catalogue, solver and deck layout.
+"""
+import argparse
+import sqlite3
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import closing
+from functools import partial
+
+import pandas as pd
+
+from truck_optimization import PLAN_CACHE_DB, cached_solve, car_types, layout_trucks
+
+SHIPMENT_DB = "shipment_details.db"
+SHIPMENT_TABLE = "ShipmentDetails"
+MODEL_CODE_TABLE = "ModelCodes"
+PLAN_TABLE = "TruckPlans"
+
+
+def load_model_codes(conn, path=None):
+    """
+    Read the Model_Code -> model name table, optionally reloading it.
+
+    Args:
+        conn (sqlite3.Connection): Shipment database.
+        path (str, optional): CSV or Excel file with Model_Code and Model
+            columns that replaces the stored table.
+
+    Returns:
+        dict: Model code -> model name.
+    """
+    if path is not None:
+        codes = pd.read_csv(path) if path.endswith(".csv") else pd.read_excel(path)
+        codes[["Model_Code", "Model"]].to_sql(
+            MODEL_CODE_TABLE, conn, if_exists="replace", index=False
+        )
+    try:
+        rows = conn.execute(f"SELECT Model_Code, Model FROM {MODEL_CODE_TABLE}").fetchall()
+    except sqlite3.OperationalError:
+        return {}
+    return {str(code).strip(): str(model).strip() for code, model in rows}
+
+
+def read_shipments(conn, model_codes, date=None):
+    """
+    Count each shipment's cars per model.
+
+    Args:
+        conn (sqlite3.Connection): Shipment database.
+        model_codes (dict): Model code -> model name.
+        date (str, optional): Only shipments gated out on this day
+            (YYYY-MM-DD).
+
+    Returns:
+        tuple: Shipment number -> {model name: cars}, and model code ->
+            cars whose code has no model in ``car_types``.
+    """
+    query = (
+        f"SELECT Shipment_n, Model_Code, COUNT(*) FROM {SHIPMENT_TABLE}"
+        + (" WHERE date(Gate_Out_D) = ?" if date else "")
+        + " GROUP BY Shipment_n, Model_Code"
+    )
+    shipments = {}
+    unmapped = {}
+    for shipment, code, cars in conn.execute(query, (date,) if date else ()):
+        code = str(code).strip()
+        model = model_codes.get(code)
+        if model not in car_types:
+            unmapped[code] = unmapped.get(code, 0) + cars
+            continue
+        quantities = shipments.setdefault(shipment, {})
+        quantities[model] = quantities.get(model, 0) + cars
+    return shipments, unmapped
+
+
+def plan_shipment(item, time_limit, cache=PLAN_CACHE_DB):
+    """
+    Solve one shipment and lay out its trucks.
+
+    Args:
+        item (tuple): Shipment number and its {model name: cars}.
+        time_limit (float): Seconds for the solver.
+        cache (str): Path of the plan cache.
+
+    Returns:
+        tuple: Shipment number, lower bound on its trucks, and one
+            (Shipment_n, Truck, Model, X, Y) row per car.
+    """
+    shipment, quantities = item
+    solution = cached_solve(car_types, quantities, time_limit=time_limit, db_path=cache)
+    rows = [
+        (shipment, truck_id + 1, car, x, y)
+        for truck_id, placements in layout_trucks(car_types, solution["trucks"]).items()
+        for car, x, y in placements
+    ]
+    return shipment, solution["lower_bound"], rows
+
+
+def write_plans(conn, shipments, rows):
+    """
+    Replace the stored plans of the given shipments.
+
+    Args:
+        conn (sqlite3.Connection): Shipment database.
+        shipments (list): Shipment numbers that were planned.
+        rows (list): (Shipment_n, Truck, Model, X, Y) rows.
+    """
+    with conn:
+        conn.execute(
+            f"CREATE TABLE IF NOT EXISTS {PLAN_TABLE} "
+            "(Shipment_n, Truck INTEGER, Model TEXT, X REAL, Y REAL)"
+        )
+        conn.executemany(
+            f"DELETE FROM {PLAN_TABLE} WHERE Shipment_n = ?",
+            [(shipment,) for shipment in shipments],
+        )
+        conn.executemany(f"INSERT INTO {PLAN_TABLE} VALUES (?, ?, ?, ?, ?)", rows)
+
+
+def parse_args(argv=None):
+    """
+    Parse the command line.
+
+    Args:
+        argv (list, optional): Arguments; defaults to ``sys.argv[1:]``.
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(
+        description="Plan the trucks of every shipment in the shipment database."
+    )
+    parser.add_argument("--db", default=SHIPMENT_DB, help="shipment database")
+    parser.add_argument("--date", help="only shipments gated out on YYYY-MM-DD")
+    parser.add_argument(
+        "--model-codes", help="CSV or Excel file with Model_Code and Model columns"
+    )
+    parser.add_argument(
+        "--time-limit", type=float, default=30.0, help="solver seconds per shipment"
+    )
+    parser.add_argument("--cache", default=PLAN_CACHE_DB, help="plan cache database")
+    parser.add_argument(
+        "--workers", type=int, default=None, help="processes (default: all cores)"
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Plan every shipment of the database across processes.
+
+    Args:
+        argv (list, optional): Command line arguments.
+    """
+    args = parse_args(argv)
+    with closing(sqlite3.connect(args.db)) as conn:
+        model_codes = load_model_codes(conn, args.model_codes)
+        shipments, unmapped = read_shipments(conn, model_codes, args.date)
+        for code, cars in sorted(unmapped.items()):
+            print(f"Model code {code} has no known model: {cars} cars left out")
+
+        plan = partial(plan_shipment, time_limit=args.time_limit, cache=args.cache)
+        rows = []
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            for shipment, lower_bound, shipment_rows in pool.map(
+                plan, shipments.items(), chunksize=16
+            ):
+                trucks = max((row[1] for row in shipment_rows), default=0)
+                print(f"Shipment {shipment}: {trucks} trucks (lower bound {lower_bound})")
+                rows.extend(shipment_rows)
+        write_plans(conn, list(shipments), rows)
+    print(f"{len(shipments)} shipments planned into {PLAN_TABLE}")
+
+
+if __name__ == "__main__":
+    main()
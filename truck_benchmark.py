@@ -0,0 +1,277 @@
+"""
+Benchmark of the truck loaders on seeded synthetic dispatches.
+
+Generates random car mixes at several scales with a few demand shapes,
+runs each loading algorithm on them and records the solve time, the
+trucks used, the deck utilisation and the lower bound on the trucks.
+Rows are appended to a CSV file together with the current git commit, so
+runs of different commits can be compared in one table.
+
+Example:
+    python truck_benchmark.py --scales 10 1000 50000 --repeats 3
+
+Modules:
+    argparse: Parses the command line.
+    math: Rounds the lower bound up to whole trucks.
+    os: Checks whether the results file already has a header.
+    subprocess: Reads the current git commit.
+    time: Times the solves.
+    numpy: Draws the seeded demand mixes.
+    pandas: Writes the results table.
+    truck_optimization: Catalogue, loaders and deck dimensions.
+"""
+import argparse
+import math
+import os
+import subprocess
+import time
+
+import numpy as np
+import pandas as pd
+
+from truck_optimization import (
+    TRUCK_CAPACITY,
+    TRUCK_LENGTH,
+    TRUCK_WIDTH,
+    car_types,
+    deck_lanes,
+    greedy_trucks,
+    solve_cutting_stock,
+)
+
+
+# Demand generators take a numpy Generator, the model names and the number
+# of cars, and return the cars per model in the same order.
+def uniform_demand(rng, models, cars):
+    """Every model equally likely."""
+    return rng.multinomial(cars, np.full(len(models), 1 / len(models)))
+
+
+def skewed_demand(rng, models, cars):
+    """A few best sellers and a long tail, as in most dispatch days."""
+    return rng.multinomial(cars, rng.dirichlet(np.full(len(models), 0.3)))
+
+
+def few_models_demand(rng, models, cars):
+    """Two or three models only, e.g. a plant's single-line dispatch."""
+    size = min(len(models), rng.integers(2, 4))
+    chosen = rng.choice(len(models), size=size, replace=False)
+    demand = np.zeros(len(models), dtype=int)
+    demand[chosen] = rng.multinomial(cars, np.full(len(chosen), 1 / len(chosen)))
+    return demand
+
+
+DEMAND_GENERATORS = {
+    "uniform": uniform_demand,
+    "skewed": skewed_demand,
+    "few_models": few_models_demand,
+}
+
+
+def random_demand(generator, cars, seed, car_types=car_types):
+    """
+    Draw one seeded dispatch.
+
+    Args:
+        generator (str): Key of ``DEMAND_GENERATORS``.
+        cars (int): Number of cars in the dispatch.
+        seed (int): Seed of the random generator.
+        car_types (dict): Model name -> (length, width).
+
+    Returns:
+        dict: Model name -> cars, without the models left at zero.
+    """
+    models = list(car_types)
+    demand = DEMAND_GENERATORS[generator](np.random.default_rng(seed), models, cars)
+    return {car: int(count) for car, count in zip(models, demand) if count}
+
+
+def simple_lower_bound(car_types, quantities):
+    """
+    Trucks needed by car count and by deck length alone.
+
+    Args:
+        car_types (dict): Model name -> (length, width).
+        quantities (dict): Model name -> cars.
+
+    Returns:
+        int: Lower bound on the trucks of any plan.
+    """
+    cars = sum(quantities.values())
+    length = sum(car_types[car][0] * count for car, count in quantities.items())
+    lanes = deck_lanes(car_types[car][1] for car in quantities)
+    return math.ceil(max(cars / TRUCK_CAPACITY, length / (lanes * TRUCK_LENGTH)) - 1e-9)
+
+
+# Algorithms take the catalogue, the quantities and the time limit, and
+# return the trucks and their own lower bound on the truck count.
+def run_greedy(car_types, quantities, time_limit):
+    """Heap loader; its bound is ``simple_lower_bound``."""
+    return greedy_trucks(car_types, quantities), simple_lower_bound(car_types, quantities)
+
+
+def run_column_generation(car_types, quantities, time_limit):
+    """Column generation solver with its LP bound."""
+    solution = solve_cutting_stock(car_types, quantities, time_limit=time_limit)
+    return solution["trucks"], solution["lower_bound"]
+
+
+ALGORITHMS = {
+    "greedy": run_greedy,
+    "column_generation": run_column_generation,
+}
+
+
+def deck_utilisation(car_types, trucks):
+    """
+    Share of the used decks' area covered by cars.
+
+    Args:
+        car_types (dict): Model name -> (length, width).
+        trucks (dict): Truck number -> list of model names.
+
+    Returns:
+        float: Car footprint over truck count times deck area.
+    """
+    if not trucks:
+        return 0.0
+    area = sum(
+        car_types[car][0] * car_types[car][1] for cars in trucks.values() for car in cars
+    )
+    return area / (len(trucks) * TRUCK_LENGTH * TRUCK_WIDTH)
+
+
+def git_commit():
+    """Short hash of the checked out commit, or "" outside a git tree."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def run_benchmark(scales, generators, algorithms, repeats=1, seed=0, time_limit=30.0):
+    """
+    Run every algorithm on every seeded dispatch.
+
+    The best lower bound found for a dispatch by any algorithm is reported
+    on all its rows, so the gaps of the algorithms compare fairly.
+
+    Args:
+        scales (list): Cars per dispatch.
+        generators (list): Keys of ``DEMAND_GENERATORS``.
+        algorithms (list): Keys of ``ALGORITHMS``.
+        repeats (int): Dispatches per scale and generator.
+        seed (int): Base seed; dispatch ``r`` uses ``seed + r``.
+        time_limit (float): Seconds per solve for the time-limited solvers.
+
+    Returns:
+        pd.DataFrame: One row per dispatch and algorithm.
+    """
+    commit = git_commit()
+    rows = []
+    for cars in scales:
+        for generator in generators:
+            for repeat in range(repeats):
+                quantities = random_demand(generator, cars, seed + repeat)
+                results = []
+                for algorithm in algorithms:
+                    start = time.perf_counter()
+                    trucks, lower_bound = ALGORITHMS[algorithm](
+                        car_types, quantities, time_limit
+                    )
+                    seconds = time.perf_counter() - start
+                    results.append((algorithm, trucks, lower_bound, seconds))
+                best_bound = max(result[2] for result in results)
+                for algorithm, trucks, lower_bound, seconds in results:
+                    rows.append(
+                        {
+                            "commit": commit,
+                            "cars": cars,
+                            "generator": generator,
+                            "seed": seed + repeat,
+                            "algorithm": algorithm,
+                            "seconds": round(seconds, 4),
+                            "trucks": len(trucks),
+                            "lower_bound": best_bound,
+                            "gap": (len(trucks) - best_bound) / len(trucks),
+                            "utilisation": deck_utilisation(car_types, trucks),
+                        }
+                    )
+    return pd.DataFrame(rows)
+
+
+def parse_args(argv=None):
+    """
+    Parse the command line.
+
+    Args:
+        argv (list, optional): Arguments; defaults to ``sys.argv[1:]``.
+
+    Returns:
+        argparse.Namespace: The parsed arguments.
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmark the truck loaders on seeded synthetic dispatches."
+    )
+    parser.add_argument(
+        "--scales",
+        nargs="+",
+        type=int,
+        default=[10, 1000, 50000],
+        help="cars per dispatch",
+    )
+    parser.add_argument(
+        "--generators",
+        nargs="+",
+        default=list(DEMAND_GENERATORS),
+        choices=list(DEMAND_GENERATORS),
+    )
+    parser.add_argument(
+        "--algorithms", nargs="+", default=list(ALGORITHMS), choices=list(ALGORITHMS)
+    )
+    parser.add_argument("--repeats", type=int, default=1, help="dispatches per scale")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--time-limit", type=float, default=30.0, help="solver seconds per dispatch"
+    )
+    parser.add_argument(
+        "--output",
+        default="truck_benchmark.csv",
+        help="CSV file the rows are appended to",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """
+    Run the benchmark and append its rows to the results file.
+
+    Args:
+        argv (list, optional): Command line arguments.
+    """
+    args = parse_args(argv)
+    results = run_benchmark(
+        args.scales,
+        args.generators,
+        args.algorithms,
+        args.repeats,
+        args.seed,
+        args.time_limit,
+    )
+    results.to_csv(
+        args.output, mode="a", header=not os.path.exists(args.output), index=False
+    )
+    summary = results.groupby(["cars", "algorithm"])[
+        ["seconds", "trucks", "lower_bound", "gap", "utilisation"]
+    ].mean()
+    print(summary.to_string(float_format="{:.3f}".format))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,696 @@
+"""
+Truck loading for car dispatch.
+
+Packs a mix of car models onto car-carrier trucks whose deck is limited by
+length, by width and by the number of cars it carries. Cars stand in lanes
+running the length of the deck, as many lanes side by side as the deck is
+wide enough for. ``Truckoptimization.ipynb`` imports the catalogue, the
+pattern generator and the loaders from here; ``truck_rendering.py`` draws
+the plans.
+
+Modules:
+    hashlib: Versions the catalogue and deck the cached plans belong to.
+    heapq: Orders the open trucks by remaining deck length.
+    json: Serialises the cached quantities and plans.
+    math: Rounds the LP bound up to whole trucks.
+    sqlite3: Persists the solved plans between runs.
+    time: Enforces the solver time limit.
+    collections: Groups the loaded cars by truck and counts truck loads.
+    numpy: Holds the pattern columns and the demand vector.
+    scipy: Solves the master LP and the MIPs with HiGHS.
+"""
+import hashlib
+import heapq
+import json
+import math
+import sqlite3
+import time
+from collections import Counter, defaultdict
+from contextlib import closing
+
+import numpy as np
+from scipy.optimize import Bounds, LinearConstraint, linprog, milp
+
+# Define the truck dimensions and capacity
+TRUCK_WIDTH = 4.65
+TRUCK_LENGTH = 33.805
+TRUCK_CAPACITY = 8
+
+# Define car types and their dimensions (length and width)
+car_types = {
+    "Grand i10": (3.8, 1.66),
+    "i20": (3.99, 1.75),
+    "Aura/Xcent": (4.01, 1.68),
+    "Creta": (4.27, 1.78),
+    "Ioniq": (4.47, 1.82),
+    "Exter": (3.81, 1.71),
+    "Verna": (4.44, 1.73),
+    "Tuscon": (4.48, 1.85),
+    "Venue": (3.995, 1.77),
+    "Kona": (4.18, 1.8),
+    "New Verna": (4.44, 1.73),
+    "Santro": (3.61, 1.64),
+    "Elantra": (4.62, 1.8),
+    "Alcazar": (4.5, 1.79)
+}
+
+# Lengths are in metres with millimetre precision; sums of them are compared
+# with this slack so a pattern that fills the deck exactly is not rejected
+# by floating point rounding.
+LENGTH_TOLERANCE = 1e-9
+
+
+def generate_patterns(car_types, max_length, max_capacity, quantities=None):
+    """
+    Enumerate the maximal truck loading patterns.
+
+    A pattern is a multiset of models, so a model may repeat up to
+    ``max_capacity`` times (or up to its quantity when ``quantities`` is
+    given). The models are walked longest first with a depth-first search
+    that stops a branch as soon as not even the shortest model still fits.
+    Only maximal patterns are kept: those to which no further car can be
+    added without breaking the length, capacity or quantity limits. Every
+    other feasible pattern is a sub-multiset of a maximal one, so no loading
+    is lost.
+
+    Args:
+        car_types (dict): Model name -> (length, width).
+        max_length (float): Usable deck length.
+        max_capacity (int): Maximum number of cars per truck.
+        quantities (dict, optional): Model name -> cars available. Models
+            missing or at zero are left out.
+
+    Returns:
+        list: (pattern length, list of model names) tuples, longest first.
+    """
+    models = []
+    for car, (length, width) in car_types.items():
+        bound = max_capacity if quantities is None else min(quantities.get(car, 0), max_capacity)
+        if bound > 0:
+            models.append((length, car, bound))
+    models.sort(key=lambda item: -item[0])
+    if not models:
+        return []
+    shortest = models[-1][0]
+    counts = [0] * len(models)
+    patterns = []
+
+    def extend(index, remaining, loaded, slack):
+        # ``slack`` is the length of the shortest model placed below its
+        # bound so far; a pattern that is not full is maximal only when its
+        # remaining length ends up below it. Models are sorted longest
+        # first, so the last model is the shortest any branch can add.
+        if (
+            index == len(models)
+            or loaded == max_capacity
+            or remaining + LENGTH_TOLERANCE < shortest
+        ):
+            if loaded == max_capacity or (loaded and remaining + LENGTH_TOLERANCE < slack):
+                pattern = [
+                    car
+                    for count, (length, car, bound) in zip(counts, models)
+                    for _ in range(count)
+                ]
+                patterns.append((max_length - remaining, pattern))
+            return
+        length, car, bound = models[index]
+        free = max_capacity - loaded
+        if (
+            remaining - (free - 1) * length + LENGTH_TOLERANCE >= slack
+            and remaining + LENGTH_TOLERANCE < free * shortest
+        ):
+            # The truck can neither be filled nor brought below ``slack``.
+            return
+        fits = min(bound, free, int((remaining + LENGTH_TOLERANCE) // length))
+        for count in range(fits, -1, -1):
+            counts[index] = count
+            extend(
+                index + 1,
+                remaining - count * length,
+                loaded + count,
+                slack if count == bound else length,
+            )
+        counts[index] = 0
+
+    extend(0, max_length, 0, float("inf"))
+
+    # Sort patterns by length in descending order
+    patterns.sort(reverse=True, key=lambda x: x[0])
+    return patterns
+
+
+def greedy_trucks(car_types, quantities, max_length=TRUCK_LENGTH, max_capacity=TRUCK_CAPACITY):
+    """
+    Load the cars longest first into the emptiest open truck.
+
+    Args:
+        car_types (dict): Model name -> (length, width).
+        quantities (dict): Model name -> cars to dispatch.
+        max_length (float): Usable deck length.
+        max_capacity (int): Maximum number of cars per truck.
+
+    Returns:
+        dict: Truck number -> list of model names.
+    """
+    # Priority queue for trucks based on remaining length
+    truck_queue = []
+    heapq.heappush(truck_queue, (-max_length, 0, []))  # (negative remaining length, truck_id, list of cars)
+    current_truck_id = 0
+
+    for car_type, (car_length, car_width) in sorted(car_types.items(), key=lambda x: -x[1][0]):
+        quantity = quantities.get(car_type, 0)
+
+        while quantity > 0:
+            remaining_length, truck_id, cars_in_truck = heapq.heappop(truck_queue)
+
+            if len(cars_in_truck) < max_capacity and -remaining_length >= car_length:
+                cars_in_truck.append(car_type)
+                remaining_length += car_length  # since remaining_length is stored as negative
+                quantity -= 1
+            else:
+                if len(cars_in_truck) == max_capacity or -remaining_length < car_length:
+                    current_truck_id += 1
+                    heapq.heappush(truck_queue, (-max_length, current_truck_id, []))
+
+            heapq.heappush(truck_queue, (remaining_length, truck_id, cars_in_truck))
+
+    trucks = defaultdict(list)
+    while truck_queue:
+        remaining_length, truck_id, cars_in_truck = heapq.heappop(truck_queue)
+        if cars_in_truck:
+            trucks[truck_id].extend(cars_in_truck)
+    return dict(trucks)
+
+
+def deck_lanes(widths, max_width=TRUCK_WIDTH):
+    """
+    Count the lanes that fit side by side whatever cars stand in them.
+
+    Args:
+        widths (iterable): Widths of the cars that may be loaded.
+        max_width (float): Usable deck width.
+
+    Returns:
+        int: Number of lanes, 0 if a car is wider than the deck.
+    """
+    return int((max_width + LENGTH_TOLERANCE) // max(widths))
+
+
+def place_truck(cars, car_types, max_length=TRUCK_LENGTH, max_width=TRUCK_WIDTH):
+    """
+    Lay one truck's cars out in lanes.
+
+    Cars are assigned longest first to the least used of the lanes returned
+    by ``deck_lanes``, backtracking with a depth-first search, so a load is
+    placed whenever any lane assignment fits. Each lane is as wide as its
+    widest car and the lanes are laid side by side from ``y = 0``; cars
+    stand nose to tail from ``x = 0``.
+
+    Args:
+        cars (list): Model names loaded on the truck.
+        car_types (dict): Model name -> (length, width).
+        max_length (float): Usable deck length.
+        max_width (float): Usable deck width.
+
+    Returns:
+        list: (model name, x, y) of each car, or None if the cars do not fit.
+    """
+    if not cars:
+        return []
+    order = sorted(cars, key=lambda car: -car_types[car][0])
+    lanes = [[] for _ in range(deck_lanes((car_types[car][1] for car in cars), max_width))]
+    used = [0.0] * len(lanes)
+
+    def assign(index):
+        if index == len(order):
+            return True
+        length = car_types[order[index]][0]
+        tried_empty = False
+        # The least used lane first, which keeps the lanes balanced.
+        for lane in sorted(range(len(lanes)), key=used.__getitem__):
+            if not lanes[lane]:
+                # Empty lanes are interchangeable; trying a second one
+                # would only repeat the branch.
+                if tried_empty:
+                    continue
+                tried_empty = True
+            if used[lane] + length <= max_length + LENGTH_TOLERANCE:
+                lanes[lane].append(order[index])
+                used[lane] += length
+                if assign(index + 1):
+                    return True
+                lanes[lane].pop()
+                used[lane] -= length
+        return False
+
+    if not lanes or not assign(0):
+        return None
+    placements = []
+    y = 0.0
+    for lane in lanes:
+        x = 0.0
+        for car in lane:
+            placements.append((car, x, y))
+            x += car_types[car][0]
+        y += max((car_types[car][1] for car in lane), default=0.0)
+    return placements
+
+
+def layout_trucks(car_types, trucks, max_length=TRUCK_LENGTH, max_width=TRUCK_WIDTH):
+    """
+    Lay out every truck of a plan.
+
+    Args:
+        car_types (dict): Model name -> (length, width).
+        trucks (dict): Truck number -> list of model names.
+        max_length (float): Usable deck length.
+        max_width (float): Usable deck width.
+
+    Returns:
+        dict: Truck number -> list of (model name, x, y).
+
+    Raises:
+        ValueError: If a truck's cars do not fit on the deck.
+    """
+    layouts = {}
+    for truck_id, cars in trucks.items():
+        layouts[truck_id] = place_truck(cars, car_types, max_length, max_width)
+        if layouts[truck_id] is None:
+            raise ValueError(f"The cars of truck {truck_id + 1} do not fit on the deck.")
+    return layouts
+
+
+def price_pattern(lengths, duals, bounds, max_length, max_capacity, time_limit, lanes=1):
+    """
+    Find the truck load worth the most under the current duals.
+
+    This is the pricing problem of the column generation: a bounded
+    knapsack with one length constraint per lane and a constraint on the
+    number of cars, solved as a small integer program.
+
+    Args:
+        lengths (np.ndarray): Length of each model.
+        duals (np.ndarray): Dual value of each model's demand row.
+        bounds (np.ndarray): Maximum copies of each model in one truck.
+        max_length (float): Usable deck length.
+        max_capacity (int): Maximum number of cars per truck.
+        time_limit (float): Seconds the MIP may run.
+        lanes (int): Lanes side by side on the deck.
+
+    Returns:
+        tuple: Value of the best load found, its count per model and
+            whether it is proven the best; (0.0, None, False) if none was
+            found in time.
+    """
+    # One variable per model and lane, lane by lane.
+    models = len(lengths)
+    per_lane = np.kron(np.eye(lanes), lengths)
+    per_model = np.tile(np.eye(models), lanes)
+    result = milp(
+        c=np.tile(-duals, lanes),
+        constraints=[
+            LinearConstraint(per_lane, -np.inf, max_length + LENGTH_TOLERANCE),
+            LinearConstraint(np.ones(models * lanes), -np.inf, max_capacity),
+            LinearConstraint(per_model, -np.inf, bounds),
+        ],
+        integrality=np.ones(models * lanes),
+        bounds=Bounds(0, np.tile(bounds, lanes)),
+        options={"time_limit": max(time_limit, 0.01)},
+    )
+    if result.x is None:
+        return 0.0, None, False
+    column = np.round(per_model @ result.x).astype(int)
+    return -result.fun, column, result.status == 0
+
+
+def load_patterns(models, patterns, counts, demand):
+    """
+    Turn pattern counts into trucks, dropping cars that were not ordered.
+
+    Args:
+        models (list): Model name of each pattern row.
+        patterns (np.ndarray): Cars per model (rows) in each pattern (columns).
+        counts (np.ndarray): Trucks loaded with each pattern.
+        demand (np.ndarray): Cars ordered per model.
+
+    Returns:
+        dict: Truck number -> list of model names.
+    """
+    left = demand.copy()
+    trucks = {}
+    for j in np.argsort(-patterns.sum(axis=0), kind="stable"):
+        for _ in range(counts[j]):
+            load = np.minimum(patterns[:, j], left)
+            left -= load
+            if load.any():
+                trucks[len(trucks)] = [
+                    car for car, count in zip(models, load) for _ in range(count)
+                ]
+    return trucks
+
+
+def solve_cutting_stock(
+    car_types,
+    quantities,
+    max_length=TRUCK_LENGTH,
+    max_capacity=TRUCK_CAPACITY,
+    time_limit=30.0,
+    max_width=TRUCK_WIDTH,
+    patterns=None,
+):
+    """
+    Load the cars onto the fewest trucks by column generation.
+
+    The master problem covers each model's demand with truck patterns and
+    minimises the number of trucks, each pattern filling the deck's lanes
+    (``deck_lanes``) within the length and the car count. Its LP
+    relaxation is solved with HiGHS and new patterns are priced in by
+    ``price_pattern`` until none has a negative reduced cost. The columns
+    found are then solved as a MIP and, separately, the rounded-down LP
+    solution is completed by solving the leftover cars again. The model's
+    size depends on the number of models, not of cars, so batches of
+    thousands of cars solve in seconds.
+
+    Args:
+        car_types (dict): Model name -> (length, width).
+        quantities (dict): Model name -> cars to dispatch.
+        max_length (float): Usable deck length.
+        max_capacity (int): Maximum number of cars per truck.
+        time_limit (float): Seconds for the whole solve. When it runs out
+            the best plan found so far is returned with its gap.
+        max_width (float): Usable deck width.
+        patterns (list, optional): Known truck loads as {model name: cars},
+            e.g. from an earlier plan, that seed the column generation so
+            it needs fewer pricing rounds.
+
+    Returns:
+        dict: ``trucks`` (truck number -> list of model names),
+            ``lower_bound`` (fewest trucks any plan can use), ``gap``
+            (relative distance of the plan to the bound) and ``optimal``.
+
+    Raises:
+        ValueError: If a model is longer or wider than the deck.
+    """
+    deadline = time.monotonic() + time_limit
+    models = [car for car in car_types if quantities.get(car, 0) > 0]
+    if not models:
+        return {"trucks": {}, "lower_bound": 0, "gap": 0.0, "optimal": True}
+    lengths = np.array([car_types[car][0] for car in models])
+    demand = np.array([quantities[car] for car in models])
+    bounds = np.minimum(demand, max_capacity)
+    lanes = deck_lanes((car_types[car][1] for car in models), max_width)
+    if lanes == 0:
+        raise ValueError("A model is wider than the truck deck.")
+
+    # Start from one single-model pattern per model, which always covers
+    # the demand.
+    columns = []
+    for i, car in enumerate(models):
+        fits = min(bounds[i], lanes * int((max_length + LENGTH_TOLERANCE) // lengths[i]))
+        if fits == 0:
+            raise ValueError(f"{car} is longer than the truck deck.")
+        column = np.zeros(len(models), dtype=int)
+        column[i] = fits
+        columns.append(column)
+
+    # Small dispatches are often loaded optimally by the greedy loader
+    # already; the car count and deck area bounds prove it without an LP.
+    greedy = greedy_trucks(car_types, quantities, max_length, max_capacity)
+    lower = max(
+        demand.sum() / max_capacity,
+        lengths @ demand / (lanes * max_length + LENGTH_TOLERANCE),
+    )
+    if len(greedy) <= math.ceil(lower - 1e-6):
+        return {"trucks": greedy, "lower_bound": len(greedy), "gap": 0.0, "optimal": True}
+
+    # Seed loads are trimmed to this dispatch; a load that no longer fits
+    # the deck (e.g. fewer lanes) is dropped.
+    for pattern in patterns or ():
+        column = np.array(
+            [min(pattern.get(car, 0), bound) for car, bound in zip(models, bounds)]
+        )
+        cars = [car for car, count in zip(models, column) for _ in range(count)]
+        if (
+            0 < len(cars) <= max_capacity
+            and not any(np.array_equal(column, known) for known in columns)
+            and place_truck(cars, car_types, max_length, max_width) is not None
+        ):
+            columns.append(column)
+
+    while True:
+        columns_matrix = np.column_stack(columns)
+        relaxation = linprog(
+            np.ones(len(columns)),
+            A_ub=-columns_matrix,
+            b_ub=-demand,
+            bounds=(0, None),
+            method="highs",
+        )
+        duals = -relaxation.ineqlin.marginals
+        value, column, proven = price_pattern(
+            lengths, duals, bounds, max_length, max_capacity,
+            deadline - time.monotonic(), lanes,
+        )
+        if not proven:
+            # Pricing ran out of time, so its incumbent may undervalue the
+            # best load and neither bounds the LP nor proves convergence.
+            break
+        if value > 0:
+            # Farley's bound: scaling the duals by the best pattern value
+            # makes them feasible, so this holds even before convergence.
+            lower = max(lower, relaxation.fun / value)
+        if value <= 1 + 1e-9:
+            lower = max(lower, relaxation.fun)
+            break
+        if (
+            column is None
+            or time.monotonic() >= deadline
+            or any(np.array_equal(column, known) for known in columns)
+        ):
+            break
+        columns.append(column)
+    lower_bound = math.ceil(lower - 1e-6)
+
+    # Three candidate plans, the fewest trucks wins: the MIP over the
+    # generated columns, the LP solution rounded down with the leftover cars
+    # solved again, and the single-lane greedy loader as a floor on quality.
+    candidates = [greedy]
+    result = milp(
+        c=np.ones(len(columns)),
+        constraints=LinearConstraint(columns_matrix, demand, np.inf),
+        integrality=np.ones(len(columns)),
+        options={"time_limit": max(deadline - time.monotonic(), 0.01)},
+    )
+    if result.x is not None:
+        candidates.append(
+            load_patterns(
+                models, columns_matrix, np.round(result.x).astype(int), demand
+            )
+        )
+    fixed = np.floor(relaxation.x + 1e-9).astype(int)
+    if fixed.any() and time.monotonic() < deadline:
+        trucks = load_patterns(models, columns_matrix, fixed, demand)
+        left = demand - np.minimum(columns_matrix @ fixed, demand)
+        if left.any():
+            rest = solve_cutting_stock(
+                car_types,
+                dict(zip(models, left.tolist())),
+                max_length,
+                max_capacity,
+                deadline - time.monotonic(),
+                max_width,
+                [dict(zip(models, column.tolist())) for column in columns],
+            )["trucks"]
+            for cars in rest.values():
+                trucks[len(trucks)] = cars
+        candidates.append(trucks)
+    trucks = min(candidates, key=len)
+
+    used = len(trucks)
+    return {
+        "trucks": trucks,
+        "lower_bound": lower_bound,
+        "gap": (used - lower_bound) / used,
+        "optimal": used == lower_bound,
+    }
+
+
+# Solved plans, keyed on the catalogue version and the quantities. Dispatch
+# keeps asking for the same or nearly the same mixes, so a repeated mix is
+# answered from the cache and a new one is warm-started from the nearest
+# cached plan.
+PLAN_CACHE_DB = "truck_plan_cache.db"
+
+
+def catalogue_version(car_types, max_length, max_capacity, max_width):
+    """
+    Fingerprint the models and the truck deck a plan was solved for.
+
+    Args:
+        car_types (dict): Model name -> (length, width).
+        max_length (float): Usable deck length.
+        max_capacity (int): Maximum number of cars per truck.
+        max_width (float): Usable deck width.
+
+    Returns:
+        str: SHA-256 hex digest; it changes whenever a model or the deck does.
+    """
+    catalogue = json.dumps(
+        [sorted(car_types.items()), max_length, max_capacity, max_width]
+    )
+    return hashlib.sha256(catalogue.encode()).hexdigest()
+
+
+def connect_plan_cache(db_path=PLAN_CACHE_DB):
+    """
+    Open the plan cache, creating its tables on first use.
+
+    Args:
+        db_path (str): Path of the SQLite database file.
+
+    Returns:
+        sqlite3.Connection: Open connection to the cache.
+    """
+    conn = sqlite3.connect(db_path, timeout=30)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS plans (catalogue TEXT, quantities TEXT, "
+        "trucks TEXT, lower_bound INTEGER, optimal INTEGER, time_limit REAL, "
+        "PRIMARY KEY (catalogue, quantities))"
+    )
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(plans)")}
+    if "time_limit" not in columns:
+        # Plans cached before the limit was stored count as solved in no time.
+        conn.execute("ALTER TABLE plans ADD COLUMN time_limit REAL")
+    return conn
+
+
+def cached_solve(
+    car_types,
+    quantities,
+    max_length=TRUCK_LENGTH,
+    max_capacity=TRUCK_CAPACITY,
+    time_limit=30.0,
+    max_width=TRUCK_WIDTH,
+    db_path=PLAN_CACHE_DB,
+):
+    """
+    ``solve_cutting_stock`` backed by the persistent plan cache.
+
+    A mix solved before for the same catalogue and deck is read back
+    without solving if its plan is optimal or was solved with at least
+    ``time_limit``. Otherwise the solver is seeded with the truck loads of
+    the cached plan nearest to the quantities (fewest cars apart, so the
+    mix's own plan when it has one), and the new plan replaces it.
+
+    Args:
+        car_types (dict): Model name -> (length, width).
+        quantities (dict): Model name -> cars to dispatch.
+        max_length (float): Usable deck length.
+        max_capacity (int): Maximum number of cars per truck.
+        time_limit (float): Seconds for the solve.
+        max_width (float): Usable deck width.
+        db_path (str): Path of the SQLite cache.
+
+    Returns:
+        dict: As ``solve_cutting_stock``.
+    """
+    catalogue = catalogue_version(car_types, max_length, max_capacity, max_width)
+    wanted = {car: count for car, count in quantities.items() if count > 0}
+    key = json.dumps(sorted(wanted.items()))
+    with closing(connect_plan_cache(db_path)) as conn:
+        cached = conn.execute(
+            "SELECT trucks, lower_bound, optimal, time_limit FROM plans "
+            "WHERE catalogue = ? AND quantities = ?",
+            (catalogue, key),
+        ).fetchone()
+        if cached and (cached[2] or (cached[3] or 0) >= time_limit):
+            trucks = dict(enumerate(json.loads(cached[0])))
+            return {
+                "trucks": trucks,
+                "lower_bound": cached[1],
+                "gap": (len(trucks) - cached[1]) / len(trucks) if trucks else 0.0,
+                "optimal": bool(cached[2]),
+            }
+
+        nearest, distance = [], None
+        for other, trucks in conn.execute(
+            "SELECT quantities, trucks FROM plans WHERE catalogue = ?", (catalogue,)
+        ):
+            other = dict(json.loads(other))
+            apart = sum(
+                abs(wanted.get(car, 0) - other.get(car, 0))
+                for car in wanted.keys() | other.keys()
+            )
+            if distance is None or apart < distance:
+                nearest, distance = json.loads(trucks), apart
+        # Only the distinct loads of the nearest plan: seeding the master
+        # with many more columns makes its MIP slower than it saves.
+        seeds = {json.dumps(sorted(Counter(cars).items())) for cars in nearest}
+
+        solution = solve_cutting_stock(
+            car_types,
+            wanted,
+            max_length,
+            max_capacity,
+            time_limit,
+            max_width,
+            [dict(json.loads(seed)) for seed in sorted(seeds)],
+        )
+        if cached:
+            # A longer solve may still end up behind the stored plan.
+            trucks = json.loads(cached[0])
+            lower_bound = max(solution["lower_bound"], cached[1])
+            if len(trucks) < len(solution["trucks"]):
+                solution["trucks"] = dict(enumerate(trucks))
+            used = len(solution["trucks"])
+            solution.update(
+                lower_bound=lower_bound,
+                gap=(used - lower_bound) / used if used else 0.0,
+                optimal=used == lower_bound,
+            )
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO plans VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    catalogue,
+                    key,
+                    json.dumps([solution["trucks"][i] for i in sorted(solution["trucks"])]),
+                    solution["lower_bound"],
+                    solution["optimal"],
+                    max(time_limit, cached[3] or 0) if cached else time_limit,
+                ),
+            )
+    return solution
+
+
+def arrange_cars_in_trucks(car_types, quantities, method="greedy", time_limit=30.0):
+    """
+    Plan the trucks for a dispatch and print them.
+
+    Args:
+        car_types (dict): Model name -> (length, width).
+        quantities (dict): Model name -> cars to dispatch.
+        method (str): ``"greedy"`` for the heap loader or
+            ``"column_generation"`` for ``solve_cutting_stock`` through the
+            plan cache (``cached_solve``).
+        time_limit (float): Seconds for the column generation solve.
+
+    Returns:
+        dict: Truck number -> list of model names.
+    """
+    if method == "greedy":
+        trucks = greedy_trucks(car_types, quantities)
+    elif method == "column_generation":
+        solution = cached_solve(car_types, quantities, time_limit=time_limit)
+        trucks = solution["trucks"]
+        print(
+            f"{len(trucks)} trucks, lower bound {solution['lower_bound']}, "
+            f"gap {solution['gap']:.1%}"
+        )
+    else:
+        raise ValueError(f"Unknown method {method!r}.")
+
+    for truck_id in sorted(trucks):
+        print(f"Truck {truck_id + 1}: {trucks[truck_id]}")
+
+    return trucks
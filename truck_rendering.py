@@ -0,0 +1,258 @@
+"""
+Drawing of truck loading plans.
+
+Plans of any size are drawn as pages of small multiples: each page holds a
+grid of truck decks in one set of axes, and all cars of a model on a page
+are one PolyCollection, so a page costs a handful of artists whatever the
+number of cars. Single trucks can be exported one file at a time without
+building the other figures.
+
+Modules:
+    os: Builds the export paths.
+    numpy: Builds the car rectangles of a page in one pass.
+    matplotlib: Draws the collections and writes PNG/SVG files.
+    truck_optimization: Deck dimensions and the lane layout of the cars.
+"""
+import os
+
+import matplotlib.pyplot as plt
+import numpy as np
+from matplotlib.collections import PolyCollection
+from matplotlib.figure import Figure
+
+from truck_optimization import TRUCK_LENGTH, TRUCK_WIDTH, layout_trucks
+
+# Space between the decks of a page, in metres.
+DECK_GAP = 1.5
+# Figure inches per metre of deck.
+INCHES_PER_METRE = 0.12
+
+
+def model_colors(car_types):
+    """
+    One fill colour per model, in catalogue order.
+
+    Args:
+        car_types (dict): Model name -> (length, width).
+
+    Returns:
+        dict: Model name -> RGBA colour.
+    """
+    palette = plt.get_cmap("tab20").colors
+    return {car: palette[i % len(palette)] for i, car in enumerate(car_types)}
+
+
+def car_polygons(car_types, layouts, truck_ids, columns):
+    """
+    Rectangles of the cars of the given trucks, grouped by model.
+
+    Truck ``i`` of ``truck_ids`` is drawn in grid cell (``i // columns``,
+    ``i % columns``), the first row at the top.
+
+    Args:
+        car_types (dict): Model name -> (length, width).
+        layouts (dict): Truck number -> list of (model name, x, y).
+        truck_ids (list): Trucks of the page, in drawing order.
+        columns (int): Decks per grid row.
+
+    Returns:
+        tuple: Model name -> (n, 4, 2) array of car corners, and the
+            (trucks, 2) array of deck origins.
+    """
+    cells = np.arange(len(truck_ids))
+    rows = -(-len(truck_ids) // columns)
+    origins = np.column_stack(
+        [
+            cells % columns * (TRUCK_LENGTH + DECK_GAP),
+            (rows - 1 - cells // columns) * (TRUCK_WIDTH + DECK_GAP),
+        ]
+    )
+    cars = [
+        (car, cell, x, y)
+        for cell, truck_id in enumerate(truck_ids)
+        for car, x, y in layouts[truck_id]
+    ]
+    if not cars:
+        return {}, origins
+    models, cell, x, y = zip(*cars)
+    models = np.array(models)
+    x0 = np.array(x) + origins[list(cell), 0]
+    y0 = np.array(y) + origins[list(cell), 1]
+    size = np.array([car_types[car] for car in models])
+    x1 = x0 + size[:, 0]
+    y1 = y0 + size[:, 1]
+    corners = np.stack(
+        [
+            np.column_stack([x0, y0]),
+            np.column_stack([x1, y0]),
+            np.column_stack([x1, y1]),
+            np.column_stack([x0, y1]),
+        ],
+        axis=1,
+    )
+    return {car: corners[models == car] for car in np.unique(models)}, origins
+
+
+def page_size(count, columns):
+    """
+    Grid columns and figure size of a page.
+
+    Args:
+        count (int): Trucks on the page.
+        columns (int): Decks per grid row wanted.
+
+    Returns:
+        tuple: Columns actually used and the (width, height) in inches.
+    """
+    columns = max(min(columns, count), 1)
+    rows = max(-(-count // columns), 1)
+    return columns, (
+        max(columns * (TRUCK_LENGTH + DECK_GAP) * INCHES_PER_METRE, 4),
+        max(rows * (TRUCK_WIDTH + DECK_GAP) * INCHES_PER_METRE + 0.6, 1.5),
+    )
+
+
+def draw_page(ax, car_types, layouts, truck_ids, columns, colors=None):
+    """
+    Draw the decks, cars and model legend of one page into an axes.
+
+    Args:
+        ax (matplotlib.axes.Axes): Axes to draw into.
+        car_types (dict): Model name -> (length, width).
+        layouts (dict): Truck number -> list of (model name, x, y).
+        truck_ids (list): Trucks of the page, in drawing order.
+        columns (int): Decks per grid row.
+        colors (dict, optional): Model name -> colour; ``model_colors``
+            by default.
+    """
+    colors = colors or model_colors(car_types)
+    polygons, origins = car_polygons(car_types, layouts, truck_ids, columns)
+    deck = np.array(
+        [[0, 0], [TRUCK_LENGTH, 0], [TRUCK_LENGTH, TRUCK_WIDTH], [0, TRUCK_WIDTH]]
+    )
+    ax.add_collection(
+        PolyCollection(
+            deck[None, :, :] + origins[:, None, :],
+            facecolors="none",
+            edgecolors="black",
+            linewidths=0.8,
+        )
+    )
+    models = []
+    for car, corners in polygons.items():
+        models.append(
+            ax.add_collection(
+                PolyCollection(
+                    corners,
+                    facecolors=colors[car],
+                    edgecolors="black",
+                    linewidths=0.3,
+                    label=car,
+                )
+            )
+        )
+    for truck_id, (x, y) in zip(truck_ids, origins):
+        ax.text(x, y + TRUCK_WIDTH + 0.15, f"Truck {truck_id + 1}", fontsize=7)
+    ax.set_xlim(-0.5, origins[:, 0].max(initial=0) + TRUCK_LENGTH + 0.5)
+    ax.set_ylim(-0.5, origins[:, 1].max(initial=0) + TRUCK_WIDTH + DECK_GAP)
+    ax.set_aspect("equal")
+    ax.set_axis_off()
+    ax.legend(
+        handles=models,
+        loc="upper center",
+        bbox_to_anchor=(0.5, 0),
+        ncol=7,
+        fontsize=7,
+        frameon=False,
+    )
+
+
+def page_figure(car_types, layouts, truck_ids, columns, colors=None):
+    """
+    A standalone figure of one page, not registered with pyplot.
+
+    Args:
+        car_types (dict): Model name -> (length, width).
+        layouts (dict): Truck number -> list of (model name, x, y).
+        truck_ids (list): Trucks of the page, in drawing order.
+        columns (int): Decks per grid row.
+        colors (dict, optional): Model name -> colour.
+
+    Returns:
+        matplotlib.figure.Figure: The drawn page.
+    """
+    columns, size = page_size(len(truck_ids), columns)
+    figure = Figure(figsize=size)
+    draw_page(figure.add_subplot(), car_types, layouts, truck_ids, columns, colors)
+    return figure
+
+
+def render_pages(car_types, trucks, per_page=24, columns=4):
+    """
+    Lazily draw a plan as pages of small multiples.
+
+    Args:
+        car_types (dict): Model name -> (length, width).
+        trucks (dict): Truck number -> list of model names.
+        per_page (int): Trucks per page.
+        columns (int): Decks per grid row.
+
+    Yields:
+        matplotlib.figure.Figure: One page at a time.
+    """
+    layouts = layout_trucks(car_types, trucks)
+    colors = model_colors(car_types)
+    truck_ids = sorted(layouts)
+    for start in range(0, len(truck_ids), per_page):
+        yield page_figure(
+            car_types, layouts, truck_ids[start:start + per_page], columns, colors
+        )
+
+
+def export_trucks(car_types, trucks, directory, fmt="png", truck_ids=None, dpi=150):
+    """
+    Lazily write one image file per truck.
+
+    Each file is drawn, saved and released before the next is started, so
+    memory stays flat however many trucks are exported.
+
+    Args:
+        car_types (dict): Model name -> (length, width).
+        trucks (dict): Truck number -> list of model names.
+        directory (str): Directory for the files; created if missing.
+        fmt (str): "png" or "svg".
+        truck_ids (list, optional): Trucks to export; all by default.
+        dpi (int): Resolution of PNG files.
+
+    Yields:
+        str: Path of each written file.
+    """
+    os.makedirs(directory, exist_ok=True)
+    colors = model_colors(car_types)
+    for truck_id in sorted(trucks) if truck_ids is None else truck_ids:
+        layouts = layout_trucks(car_types, {truck_id: trucks[truck_id]})
+        figure = page_figure(car_types, layouts, [truck_id], 1, colors)
+        path = os.path.join(directory, f"truck_{truck_id + 1}.{fmt}")
+        figure.savefig(path, format=fmt, dpi=dpi, bbox_inches="tight")
+        yield path
+
+
+def plot_solution(car_types, trucks, per_page=24, columns=4):
+    """
+    Show a plan in the notebook, one page of small multiples at a time.
+
+    Args:
+        car_types (dict): Model name -> (length, width).
+        trucks (dict): Truck number -> list of model names.
+        per_page (int): Trucks per page.
+        columns (int): Decks per grid row.
+    """
+    layouts = layout_trucks(car_types, trucks)
+    colors = model_colors(car_types)
+    truck_ids = sorted(layouts)
+    for start in range(0, len(truck_ids), per_page):
+        page = truck_ids[start:start + per_page]
+        page_columns, size = page_size(len(page), columns)
+        figure = plt.figure(figsize=size)
+        draw_page(figure.add_subplot(), car_types, layouts, page, page_columns, colors)
+        plt.show()